@@ -1,13 +1,53 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
 import random
+import sys
+import functools
+import bisect
+import math
+from abc import ABC, abstractmethod
+from collections import deque
 from datetime import date, datetime
 import calendar as cal
 import os
 import json
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import re
+import struct
+import threading
+import queue
+import time
+import atexit
+import logging
+import logging.handlers
+
+# Tkinter, SQLite and the mail modules are imported where they are first
+# used, so the data layer can be imported and scripted without a display.
+# The names below are filled in by load_gui_modules(), load_mail_modules()
+# and load_sqlite_module().
+tk = ttk = scrolledtext = messagebox = None
+smtplib = MIMEText = MIMEMultipart = None
+sqlite3 = None
+
+
+def load_gui_modules():
+    """Import Tkinter into the module namespace for the GUI code"""
+    global tk, ttk, scrolledtext, messagebox
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, messagebox
+
+
+def load_mail_modules():
+    """Import smtplib and the email builders the first time mail is sent"""
+    global smtplib, MIMEText, MIMEMultipart
+    if smtplib is None:
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        import smtplib
+
+
+def load_sqlite_module():
+    """Import sqlite3 the first time the SQLite journal is opened"""
+    global sqlite3
+    if sqlite3 is None:
+        import sqlite3
 
 # ================= COLOR AND FONT CONSTANTS =================
 COLORS = {
@@ -34,11 +74,785 @@ FONTS = {
 
 # ================= FILE PATHS =================
 HIGHSCORE_FILE = "highscore.txt"
+HIGHSCORE_REPLAY_FILE = "highscore.replay"
+REPLAY_DIR = "replays"
 ACHIEVEMENTS_FILE = "achievements.json"
 JOURNAL_FILE = "journal_entries.json"
+JOURNAL_LOG_FILE = "journal_entries.log"
+JOURNAL_DB_FILE = "journal_entries.db"
 SETTINGS_FILE = "settings.json"
 EMAIL_CONFIG_FILE = "email_config.json"
+EMAIL_OUTBOX_FILE = "email_outbox.json"
 ERROR_LOG_FILE = "error_log.txt"
+METRICS_FILE = "metrics.json"
+GAME_SESSIONS_FILE = "game_sessions.log"
+
+# Size (in bytes) the journal log may reach before it is merged into the snapshot
+JOURNAL_COMPACT_THRESHOLD = 256 * 1024
+
+# Milliseconds the Tk main loop may go unresponsive before its stack is logged
+STALL_THRESHOLD_MS = 500
+
+# Metrics export: localhost port for Prometheus scrapes and seconds between
+# JSON snapshots; 0 turns either off (both can be set in settings.json)
+METRICS_PORT = 0
+METRICS_SNAPSHOT_INTERVAL = 0
+
+# Number of recent game replays kept in REPLAY_DIR, and how many times
+# faster than real time the best game is played back
+REPLAY_KEEP = 50
+REPLAY_SPEED = 3
+
+# Number of best games shown on the Games tab leaderboard
+LEADERBOARD_SIZE = 10
+
+# Journal entries the history list fetches at a time as it is scrolled
+HISTORY_PAGE_SIZE = 50
+
+# Error log rotation: size of one log file and how many old files are kept
+LOG_MAX_BYTES = 512 * 1024
+LOG_BACKUP_COUNT = 3
+# Lowest level written to the log; "log_level": "INFO" in settings.json also
+# records timings such as journal loads, tab builds and emails sent
+LOG_LEVEL = logging.WARNING
+
+# Seconds changed data may wait in memory before it is written out as a batch
+WRITE_COALESCE_DELAY = 0.5
+
+# Seconds an idle SMTP connection stays open for the next email
+SMTP_IDLE_TIMEOUT = 60
+# Seconds to wait on the mail server before giving up on a connection
+SMTP_TIMEOUT = 30
+
+# ================= LOGGING =================
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating log file that stays open and only flushes now and then.
+    It runs on the log listener thread, so disk writes never hold up the UI.
+    Errors are flushed straight away so they are on disk if the app dies.
+    """
+    
+    FLUSH_INTERVAL = 1.0
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_flush = time.monotonic()
+    
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.flush(force=True)
+    
+    def flush(self, force=False):
+        # StreamHandler calls flush() after every record; batch those up
+        if force or time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL:
+            super().flush()
+            self.last_flush = time.monotonic()
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as: [time] LEVEL component/operation: message key=value ..."""
+    
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
+        source = getattr(record, 'component', 'app')
+        if getattr(record, 'operation', None):
+            source += f"/{record.operation}"
+        
+        fields = dict(getattr(record, 'fields', {}))
+        if getattr(record, 'latency_ms', None) is not None:
+            fields['latency_ms'] = f"{record.latency_ms:.1f}"
+        extras = "".join(f" {key}={value}" for key, value in fields.items())
+        
+        line = f"[{timestamp}] {record.levelname} {source}: {record.getMessage()}{extras}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+app_logger = logging.getLogger("everydaymood")
+log_listener = None
+
+
+def setup_logging(log_file=ERROR_LOG_FILE, level=LOG_LEVEL):
+    """
+    Send app logging through a queue to a rotating log file, written by a
+    background listener thread. Safe to call more than once.
+    """
+    global log_listener
+    if log_listener is not None:
+        return
+    
+    handler = BufferedRotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8', delay=True
+    )
+    handler.setFormatter(StructuredFormatter())
+    
+    log_queue = queue.SimpleQueue()
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.setLevel(level)
+    app_logger.propagate = False
+    
+    log_listener = logging.handlers.QueueListener(log_queue, handler)
+    log_listener.start()
+
+
+def stop_logging():
+    """Write out queued log records; registered first so it runs last at exit"""
+    global log_listener
+    listener, log_listener = log_listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in list(app_logger.handlers):
+        app_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
+
+
+def set_log_level(level):
+    """Change the lowest level logged, e.g. 'INFO' to include timing records"""
+    number = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(number, int):
+        raise ValueError(f"Unknown log level: {level}")
+    setup_logging()
+    app_logger.setLevel(number)
+
+
+def log_event(level, message, component='app', operation=None, latency_ms=None, **fields):
+    """Log a message with structured fields; never blocks on disk"""
+    setup_logging()
+    app_logger.log(level, message, extra={
+        'component': component,
+        'operation': operation,
+        'latency_ms': latency_ms,
+        'fields': fields
+    })
+
+
+def log_error(message, component='app', operation=None, **fields):
+    """Log an error to the error log"""
+    log_event(logging.ERROR, message, component, operation, **fields)
+
+
+# ================= CALLBACK TRACING =================
+class LatencyHistogram:
+    """Wall-time histogram with fixed millisecond buckets"""
+    
+    BUCKETS_MS = (1, 2, 5, 10, 16, 33, 50, 100, 250, 500, 1000, float('inf'))
+    
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+    
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class CallbackTracer:
+    """
+    Opt-in timing of Tk callbacks and after() jobs.
+    Callbacks wrapped with traced() record their wall time per name while
+    tracing is enabled. A call slower than slow_ms is logged, and the next
+    call with that name runs under cProfile; if that call is slow too, its
+    profile is kept for the report.
+    """
+    
+    SLOW_CALLBACK_MS = 50
+    PROFILE_LINES = 15
+    
+    def __init__(self, slow_ms=SLOW_CALLBACK_MS):
+        self.enabled = False
+        self.slow_ms = slow_ms
+        self.histograms = {}
+        self.slow_counts = {}
+        self.profile_next = set()
+        self.profiles = {}
+        self.profiling = False
+    
+    def traced(self, name):
+        """Decorator: time every call of the function under this name"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                return self.call(name, func, args, kwargs)
+            return wrapper
+        return decorate
+    
+    def call(self, name, func, args, kwargs):
+        profiler = None
+        if name in self.profile_next and not self.profiling:
+            import cProfile
+            self.profile_next.discard(name)
+            self.profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if profiler is not None:
+                profiler.disable()
+                self.profiling = False
+            self.record(name, elapsed_ms, profiler)
+    
+    def record(self, name, elapsed_ms, profiler=None):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(elapsed_ms)
+        
+        if elapsed_ms < self.slow_ms:
+            return
+        self.slow_counts[name] = self.slow_counts.get(name, 0) + 1
+        log_event(logging.WARNING, "Slow UI callback", 'ui', name, elapsed_ms)
+        if profiler is not None:
+            self.profiles[name] = self.format_profile(profiler)
+        else:
+            self.profile_next.add(name)
+    
+    def format_profile(self, profiler):
+        import io
+        import pstats
+        
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(self.PROFILE_LINES)
+        return out.getvalue()
+    
+    def reset(self):
+        self.histograms.clear()
+        self.slow_counts.clear()
+        self.profile_next.clear()
+        self.profiles.clear()
+    
+    def report(self, profiles=True):
+        """Summary table of every traced callback, slowest total first"""
+        if not self.histograms:
+            return "No callbacks traced yet."
+        
+        lines = [f"{'callback':<28}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'slow':>6}"]
+        ordered = sorted(self.histograms.items(), key=lambda item: item[1].total_ms, reverse=True)
+        for name, histogram in ordered:
+            lines.append(
+                f"{name:<28}{histogram.count:>7}{histogram.percentile(0.5):>9.1f}"
+                f"{histogram.percentile(0.95):>9.1f}{histogram.max_ms:>9.1f}"
+                f"{self.slow_counts.get(name, 0):>6}"
+            )
+        if profiles:
+            for name, profile in self.profiles.items():
+                lines.append(f"\nProfile of slow {name}:\n{profile}")
+        return "\n".join(lines)
+    
+    def log_report(self):
+        """Write the report to the log at exit; only has data if tracing was on"""
+        if self.histograms:
+            log_event(logging.WARNING, "UI callback latency\n" + self.report(), 'ui', 'trace_report')
+
+
+callback_tracer = CallbackTracer()
+atexit.register(callback_tracer.log_report)
+
+
+# ================= MAIN LOOP WATCHDOG =================
+class StallWatchdog:
+    """
+    Detects a frozen Tk main loop. The Tk thread bumps a heartbeat every
+    HEARTBEAT_MS through after(); a watchdog thread checks it, and if no
+    beat arrived for threshold_ms it logs the Tk thread's current stack.
+    Stalls are counted and their durations kept in a histogram.
+    """
+    
+    HEARTBEAT_MS = 100
+    
+    def __init__(self, widget, threshold_ms=STALL_THRESHOLD_MS):
+        self.widget = widget
+        self.threshold_ms = threshold_ms
+        self.last_beat = time.monotonic()
+        self.tk_thread_id = None
+        self.stalls = LatencyHistogram()
+        self.stall_started = None
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Start watching; call from the Tk thread"""
+        self.tk_thread_id = threading.get_ident()
+        self.beat()
+        self.thread = threading.Thread(target=self.run, name="stall-watchdog", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop watching and wait for the watchdog thread to finish"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(1)
+    
+    def beat(self):
+        self.last_beat = time.monotonic()
+        try:
+            self.widget.after(self.HEARTBEAT_MS, self.beat)
+        except tk.TclError:
+            self.stop()  # Window destroyed
+    
+    def run(self):
+        check_interval = min(self.HEARTBEAT_MS, self.threshold_ms) / 2000
+        while not self.stop_event.wait(check_interval):
+            self.check(time.monotonic())
+    
+    def check(self, now):
+        last_beat = self.last_beat
+        silent_ms = (now - last_beat) * 1000 - self.HEARTBEAT_MS
+        
+        if self.stall_started is None:
+            if silent_ms >= self.threshold_ms:
+                self.stall_started = last_beat
+                self.dump_stack(silent_ms)
+        elif last_beat > self.stall_started:
+            # A beat got through: the loop is running again
+            duration_ms = (last_beat - self.stall_started) * 1000 - self.HEARTBEAT_MS
+            self.stalls.record(duration_ms)
+            self.stall_started = None
+            log_event(logging.WARNING, "Main loop recovered", 'ui', 'stall', duration_ms,
+                      stalls=self.stalls.count)
+    
+    def dump_stack(self, silent_ms):
+        """Log where the Tk thread is stuck"""
+        import traceback
+        
+        frame = sys._current_frames().get(self.tk_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "(no stack available)\n"
+        log_event(logging.WARNING, "Main loop not responding, Tk thread stack:\n" + stack.rstrip(),
+                  'ui', 'stall', silent_ms)
+    
+    def report(self):
+        if not self.stalls.count:
+            return "No main loop stalls."
+        return (
+            f"Main loop stalls over {self.threshold_ms} ms: {self.stalls.count}, "
+            f"total {self.stalls.total_ms / 1000:.1f} s, "
+            f"p95 {self.stalls.percentile(0.95):.0f} ms, longest {self.stalls.max_ms:.0f} ms"
+        )
+    
+    def log_report(self):
+        """Write the stall summary to the log at exit, if there were any stalls"""
+        if self.stalls.count:
+            log_event(logging.WARNING, self.report(), 'ui', 'stall_report')
+
+
+# ================= METRICS =================
+class Counter:
+    """Monotonic count, e.g. entries saved"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+    
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+    
+    def samples(self):
+        return [(self.name, '', self.value)]
+    
+    def snapshot(self):
+        return self.value
+
+
+class Gauge(Counter):
+    """Value that goes up and down; func, if given, is read at export time"""
+    
+    kind = 'gauge'
+    
+    def __init__(self, name, help_text, func=None):
+        super().__init__(name, help_text)
+        self.func = func
+    
+    def set(self, value):
+        with self.lock:
+            self.value = value
+    
+    def current(self):
+        if self.func is None:
+            return self.value
+        try:
+            return self.func()
+        except Exception:
+            return 0
+    
+    def samples(self):
+        return [(self.name, '', self.current())]
+    
+    def snapshot(self):
+        return self.current()
+
+
+class Histogram:
+    """Latency distribution in milliseconds, exported in seconds"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.latencies = LatencyHistogram()
+        self.lock = threading.Lock()
+    
+    def observe_ms(self, ms):
+        with self.lock:
+            self.latencies.record(ms)
+    
+    def samples(self):
+        with self.lock:
+            counts = list(self.latencies.counts)
+            count, total_ms = self.latencies.count, self.latencies.total_ms
+        
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(LatencyHistogram.BUCKETS_MS, counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float('inf') else f"{bound / 1000:g}"
+            samples.append((self.name + '_bucket', f'{{le="{le}"}}', cumulative))
+        samples.append((self.name + '_sum', '', round(total_ms / 1000, 6)))
+        samples.append((self.name + '_count', '', count))
+        return samples
+    
+    def snapshot(self):
+        with self.lock:
+            latencies = self.latencies
+            return {
+                'count': latencies.count,
+                'mean_ms': round(latencies.total_ms / latencies.count, 3) if latencies.count else 0.0,
+                'p50_ms': round(latencies.percentile(0.5), 3),
+                'p95_ms': round(latencies.percentile(0.95), 3),
+                'max_ms': round(latencies.max_ms, 3)
+            }
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms for watching a running app.
+    Exported as Prometheus text over a localhost HTTP endpoint and/or as a
+    JSON snapshot file rewritten every few seconds; both are off by default.
+    """
+    
+    def __init__(self, prefix='everydaymood'):
+        self.prefix = prefix
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.snapshot_stop = None
+    
+    def register(self, cls, name, *args):
+        """Return the metric with this name, creating it on first use"""
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(f"{self.prefix}_{name}", *args)
+            return metric
+    
+    def counter(self, name, help_text=""):
+        return self.register(Counter, name, help_text)
+    
+    def gauge(self, name, help_text="", func=None):
+        return self.register(Gauge, name, help_text, func)
+    
+    def histogram(self, name, help_text=""):
+        return self.register(Histogram, name, help_text)
+    
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self):
+        with self.lock:
+            metrics = dict(self.metrics)
+        return {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'metrics': {name: metric.snapshot() for name, metric in metrics.items()}
+        }
+    
+    def write_snapshot(self, path=METRICS_FILE):
+        atomic_write_text(path, json.dumps(self.snapshot(), indent=4))
+    
+    def start_server(self, port, host='127.0.0.1'):
+        """Serve /metrics on localhost; returns the port actually bound"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        registry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        log_event(logging.INFO, "Metrics endpoint started", 'metrics', 'serve',
+                  url=f"http://{host}:{self.server.server_port}/metrics")
+        return self.server.server_port
+    
+    def start_snapshots(self, interval, path=METRICS_FILE):
+        """Rewrite the JSON snapshot every interval seconds"""
+        stop = self.snapshot_stop = threading.Event()
+        
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.write_snapshot(path)
+                except Exception as e:
+                    log_error(f"Error writing metrics snapshot: {str(e)}", 'metrics', 'snapshot')
+        
+        threading.Thread(target=run, name="metrics-snapshot", daemon=True).start()
+    
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.snapshot_stop is not None:
+            self.snapshot_stop.set()
+            self.snapshot_stop = None
+
+
+def journal_disk_bytes():
+    """Size of the journal files currently on disk"""
+    paths = [JOURNAL_FILE, JOURNAL_LOG_FILE, JOURNAL_DB_FILE, JOURNAL_DB_FILE + "-wal"]
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+metrics = MetricsRegistry()
+metrics.counter('journal_entries_saved_total', "Journal entries saved")
+metrics.gauge('journal_entries', "Journal entries currently stored")
+metrics.gauge('journal_disk_bytes', "Size of the journal files on disk", journal_disk_bytes)
+metrics.histogram('journal_search_seconds', "Time to query journal history")
+metrics.counter('emails_sent_total', "Journal emails delivered")
+metrics.counter('emails_failed_total', "Journal email delivery attempts that failed")
+metrics.gauge('email_outbox_pending', "Emails waiting in the outbox")
+metrics.histogram('smtp_send_seconds', "Time to hand one email to the SMTP server")
+metrics.counter('game_frames_total', "Game frames rendered")
+metrics.counter('game_frames_dropped_total', "Game steps dropped because frames fell too far behind")
+
+
+# ================= WRITE COALESCING =================
+def atomic_write_text(path, text, fsync=False):
+    """Write a file through a temp file and rename, so it is never half-written"""
+    atomic_write(path, text, 'w', fsync)
+
+
+def atomic_write_bytes(path, data, fsync=False):
+    """Binary version of atomic_write_text"""
+    atomic_write(path, data, 'wb', fsync)
+
+
+def atomic_write(path, data, mode, fsync):
+    temp_file = path + ".tmp"
+    with open(temp_file, mode) as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+
+class WriteCoalescer:
+    """
+    Group commit for the app's data files.
+    Stores call mark_dirty() instead of writing, and every dirty store is
+    written once when the batch is flushed, after a short delay or at exit.
+    A store only needs a write_to_disk(fsync) method.
+    
+    Durability modes:
+        'always' - write and fsync on every change, no coalescing
+        'batch'  - coalesce writes, fsync once per flush (default)
+        'none'   - coalesce writes, leave syncing to the OS
+    """
+    
+    MODES = ('always', 'batch', 'none')
+    
+    def __init__(self, delay=WRITE_COALESCE_DELAY, durability='batch'):
+        self.delay = delay
+        self.durability = durability
+        self.dirty = {}
+        self.timer = None
+        self.lock = threading.Lock()
+        # Serializes the actual writes, whichever thread triggers them
+        self.flush_lock = threading.Lock()
+    
+    def set_durability(self, mode):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown durability mode: {mode}")
+        self.durability = mode
+    
+    def mark_dirty(self, store):
+        """Schedule a store to be written with the next batch"""
+        if self.durability == 'always':
+            self.write_store(store)
+            return
+        
+        with self.lock:
+            self.dirty[store] = True
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+    
+    def write_store(self, store):
+        with self.flush_lock:
+            store.write_to_disk(fsync=self.durability != 'none')
+    
+    def flush(self):
+        """Write every dirty store now"""
+        with self.lock:
+            stores = list(self.dirty)
+            self.dirty.clear()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        
+        for store in stores:
+            self.write_store(store)
+
+
+write_coalescer = WriteCoalescer()
+atexit.register(write_coalescer.flush)
+
+
+# ================= SMTP SESSION CLASS =================
+class SMTPSession:
+    """
+    Keeps one logged-in SMTP connection open between sends, so back-to-back
+    emails skip the connect, STARTTLS and login round trips. The connection
+    is checked with NOOP before reuse, reopened if the server dropped it,
+    and closed after SMTP_IDLE_TIMEOUT seconds without a send.
+    """
+    
+    def __init__(self, idle_timeout=SMTP_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.server_key = None
+        self.idle_timer = None
+        self.lock = threading.Lock()
+    
+    def send(self, config, msg):
+        """Send a message, (re)connecting only when needed"""
+        load_mail_modules()
+        
+        with self.lock:
+            self.cancel_idle_timer()
+            try:
+                try:
+                    self.connect(config).send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Dropped between the NOOP check and the send; retry once
+                    self.disconnect()
+                    self.connect(config).send_message(msg)
+            except Exception:
+                self.disconnect()
+                raise
+            self.start_idle_timer()
+    
+    def connect(self, config):
+        """Return a live connection for this configuration"""
+        key = (config['smtp_server'], config['smtp_port'], config.get('use_tls', True),
+               config['sender_email'], config['sender_password'])
+        if self.server is not None and (key != self.server_key or not self.is_alive()):
+            self.disconnect()
+        
+        if self.server is None:
+            server = smtplib.SMTP(config['smtp_server'], config['smtp_port'], timeout=SMTP_TIMEOUT)
+            try:
+                if config.get('use_tls', True):
+                    server.starttls()
+                server.login(config['sender_email'], config['sender_password'])
+            except Exception:
+                server.close()
+                raise
+            self.server = server
+            self.server_key = key
+        return self.server
+    
+    def is_alive(self):
+        """NOOP health check of the open connection"""
+        try:
+            return self.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def disconnect(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+        self.server_key = None
+    
+    def start_idle_timer(self):
+        self.idle_timer = threading.Timer(self.idle_timeout, self.close)
+        self.idle_timer.daemon = True
+        self.idle_timer.start()
+    
+    def cancel_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+    
+    def close(self):
+        """Close the connection (also called by the idle timer)"""
+        with self.lock:
+            self.cancel_idle_timer()
+            self.disconnect()
+
 
 # ================= EMAIL NOTIFIER CLASS =================
 class EmailNotifier:
@@ -46,6 +860,7 @@ class EmailNotifier:
     
     def __init__(self):
         self.config = self.load_config()
+        self.session = SMTPSession()
     
     def load_config(self):
         """Load email configuration from file"""
@@ -58,33 +873,32 @@ class EmailNotifier:
                 default_config = {
                     "smtp_server": "smtp.gmail.com",
                     "smtp_port": 587,
+                    "use_tls": True,
                     "sender_email": "",
                     "sender_password": "",
                     "recipient_email": "",
                     "notifications_enabled": False
                 }
-                with open(EMAIL_CONFIG_FILE, 'w') as f:
-                    json.dump(default_config, f, indent=4)
+                atomic_write_text(EMAIL_CONFIG_FILE, json.dumps(default_config, indent=4))
                 return default_config
         except Exception as e:
-            self.log_error(f"Error loading email config: {str(e)}")
+            log_error(f"Error loading email config: {str(e)}", 'email', 'load_config')
             return None
     
     def save_config(self, config):
         """Save email configuration to file"""
         try:
-            with open(EMAIL_CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=4)
+            atomic_write_text(EMAIL_CONFIG_FILE, json.dumps(config, indent=4), fsync=True)
             self.config = config
             return True
         except Exception as e:
-            self.log_error(f"Error saving email config: {str(e)}")
+            log_error(f"Error saving email config: {str(e)}", 'email', 'save_config')
             return False
     
-    def send_journal_notification(self, entry_data):
+    def check_ready(self):
         """
-        Send email notification when new journal entry is created
-        Returns: (success: bool, error_message: str)
+        Check that notifications are enabled and fully configured
+        Returns: (ready: bool, error_message: str)
         """
         if not self.config or not self.config.get('notifications_enabled', False):
             return (False, "Notifications disabled")
@@ -96,6 +910,20 @@ class EmailNotifier:
         if not self.config.get('recipient_email'):
             return (False, "Recipient email not set")
         
+        return (True, "")
+    
+    def send_journal_notification(self, entry_data):
+        """
+        Send email notification when new journal entry is created
+        Returns: (success: bool, error_message: str, transient: bool);
+        transient is True when the failure may go away if the send is retried
+        """
+        load_mail_modules()
+        
+        ready, message = self.check_ready()
+        if not ready:
+            return (False, message, False)
+        
         try:
             # Create message
             msg = MIMEMultipart()
@@ -132,72 +960,1077 @@ Your EverydayMood App 💕
             
             msg.attach(MIMEText(body, 'plain'))
             
-            # Connect to SMTP server and send
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['sender_email'], self.config['sender_password'])
-            server.send_message(msg)
-            server.quit()
+            # Send over the shared connection, reconnecting only if needed
+            started = time.perf_counter()
+            self.session.send(self.config, msg)
+            latency_ms = (time.perf_counter() - started) * 1000
+            log_event(logging.INFO, "Email sent", 'email', 'send', latency_ms,
+                      entry_id=entry_data.get('id'))
+            metrics.counter('emails_sent_total').inc()
+            metrics.histogram('smtp_send_seconds').observe_ms(latency_ms)
             
-            return (True, "Email sent successfully!")
+            return (True, "Email sent successfully!", False)
             
         except smtplib.SMTPAuthenticationError:
             error_msg = "Authentication failed. Please check your email and password."
-            self.log_error(error_msg)
-            return (False, error_msg)
+            log_error(error_msg, 'email', 'send', entry_id=entry_data.get('id'))
+            metrics.counter('emails_failed_total').inc()
+            return (False, error_msg, False)
         except smtplib.SMTPException as e:
             error_msg = f"SMTP error: {str(e)}"
-            self.log_error(error_msg)
-            return (False, error_msg)
+            log_error(error_msg, 'email', 'send', entry_id=entry_data.get('id'))
+            metrics.counter('emails_failed_total').inc()
+            return (False, error_msg, self.is_transient(e))
+        except OSError as e:
+            # Connection refused, timed out or the server name didn't resolve
+            error_msg = f"Could not reach the mail server: {str(e)}"
+            log_error(error_msg, 'email', 'send', entry_id=entry_data.get('id'))
+            metrics.counter('emails_failed_total').inc()
+            return (False, error_msg, True)
         except Exception as e:
             error_msg = f"Error sending email: {str(e)}"
-            self.log_error(error_msg)
-            return (False, error_msg)
+            log_error(error_msg, 'email', 'send', entry_id=entry_data.get('id'))
+            metrics.counter('emails_failed_total').inc()
+            return (False, error_msg, False)
+    
+    @staticmethod
+    def is_transient(error):
+        """Whether an SMTP error is worth retrying: dropped connections and 4xx replies"""
+        if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+            return True
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, reply in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        return False
+
+
+# ================= EMAIL OUTBOX CLASS =================
+class EmailOutbox:
+    """
+    Durable queue of journal notifications waiting to be sent.
+    Pending emails are kept in email_outbox.json, so they survive restarts,
+    and a background thread delivers them. Temporary failures (the server
+    can't be reached, timed out or answered 4xx) are retried with
+    exponential backoff; permanent ones (notifications turned off, missing
+    settings, a rejected login or recipient) are dropped straight away.
+    """
+    
+    RETRY_BASE = 30       # Seconds before the first retry
+    RETRY_MAX = 3600      # Longest wait between retries
+    MAX_ATTEMPTS = 10     # Attempts before an email is given up on
     
-    def log_error(self, message):
-        """Log errors to file"""
+    def __init__(self, email_notifier, outbox_file=EMAIL_OUTBOX_FILE, on_done=None):
+        self.email_notifier = email_notifier
+        self.outbox_file = outbox_file
+        self.on_done = on_done
+        self.condition = threading.Condition()
+        self.items = self.load()
+        self.thread = None
+    
+    def load(self):
+        """Load pending emails left over from earlier runs"""
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(ERROR_LOG_FILE, 'a') as f:
-                f.write(f"[{timestamp}] {message}\n")
-        except:
-            pass  # Silently fail if can't write to log
+            if os.path.exists(self.outbox_file):
+                with open(self.outbox_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            log_error(f"Error loading email outbox: {str(e)}", 'outbox', 'load')
+        return []
+    
+    def write_to_disk(self, fsync=False):
+        """Write the pending emails to disk (called by the write coalescer)"""
+        try:
+            with self.condition:
+                data = json.dumps(self.items)
+            atomic_write_text(self.outbox_file, data, fsync)
+        except Exception as e:
+            log_error(f"Error saving email outbox: {str(e)}", 'outbox', 'save')
+    
+    def pending_count(self):
+        with self.condition:
+            return len(self.items)
+    
+    def enqueue(self, entry_data):
+        """Queue a notification for an entry and wake the delivery thread"""
+        with self.condition:
+            self.items.append({
+                'entry': dict(entry_data),
+                'attempts': 0,
+                'next_attempt': 0,
+                'last_error': ""
+            })
+            self.condition.notify()
+        write_coalescer.mark_dirty(self)
+        self.start()
+    
+    def start(self):
+        """Start delivering in the background if anything is pending"""
+        with self.condition:
+            if self.thread is not None or not self.items:
+                return
+            self.thread = threading.Thread(target=self.run, name="email-outbox", daemon=True)
+            self.thread.start()
+    
+    def retry_delay(self, attempts):
+        """Exponential backoff with some jitter so retries don't line up"""
+        delay = min(self.RETRY_BASE * 2 ** (attempts - 1), self.RETRY_MAX)
+        return delay * random.uniform(0.8, 1.2)
+    
+    def next_due(self):
+        """Block until an email is due, then return it"""
+        with self.condition:
+            while True:
+                if not self.items:
+                    self.condition.wait()
+                    continue
+                item = min(self.items, key=lambda i: i['next_attempt'])
+                wait = item['next_attempt'] - time.time()
+                if wait <= 0:
+                    return item
+                self.condition.wait(wait)
+    
+    def run(self):
+        while True:
+            item = self.next_due()
+            success, message, transient = self.email_notifier.send_journal_notification(item['entry'])
+            
+            with self.condition:
+                if success:
+                    self.items.remove(item)
+                else:
+                    item['attempts'] += 1
+                    item['last_error'] = message
+                    if not transient or item['attempts'] >= self.MAX_ATTEMPTS:
+                        self.items.remove(item)
+                        log_error(
+                            f"Giving up on email for entry {item['entry'].get('id')}: {message}",
+                            'outbox', 'deliver', attempts=item['attempts']
+                        )
+                    else:
+                        item['next_attempt'] = time.time() + self.retry_delay(item['attempts'])
+                        message = f"{message} - will retry"
+            write_coalescer.mark_dirty(self)
+            
+            if self.on_done:
+                try:
+                    self.on_done(item['entry'].get('id'), success, message)
+                except Exception as e:
+                    log_error(f"Error finishing email delivery: {str(e)}", 'outbox', 'deliver')
+
+
+# ================= JOURNAL LOG CLASS =================
+class JournalLog:
+    """
+    Append-only JSON-lines log layered on top of the journal snapshot.
+
+    The snapshot keeps the original journal_entries.json format, so existing
+    journals load unchanged. Every change is appended to the log as one
+    record, and once the log passes the compaction threshold it is merged
+    back into the snapshot.
+    """
+    
+    def __init__(self, snapshot_file=JOURNAL_FILE, log_file=JOURNAL_LOG_FILE,
+                 compact_threshold=JOURNAL_COMPACT_THRESHOLD):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self.compaction_thread = None
+        # Records waiting for the write coalescer to append them
+        self.pending = []
+        self.log_size = 0
+    
+    def load(self):
+        """Load the snapshot and replay the log on top of it"""
+        entries = []
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r') as f:
+                entries = json.load(f)
+        
+        by_id = {entry.get('id'): entry for entry in entries}
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from an interrupted write
+                    self.apply_record(record, entries, by_id)
+            self.log_size = os.path.getsize(self.log_file)
+        return entries
+    
+    def apply_record(self, record, entries, by_id):
+        """Apply one log record to the loaded entries"""
+        op = record.get('op')
+        if op == 'add':
+            entry = record.get('entry', {})
+            # Records already merged into the snapshot are skipped, which
+            # makes replaying after an interrupted compaction safe
+            if entry.get('id') not in by_id:
+                entries.append(entry)
+                by_id[entry.get('id')] = entry
+        elif op == 'update':
+            entry = by_id.get(record.get('id'))
+            if entry is not None:
+                entry.update(record.get('fields', {}))
+    
+    def append(self, record):
+        """
+        Queue one record for the log; the write coalescer appends it with
+        the next batch
+        Returns: size the log will have once the record is written
+        """
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self.lock:
+            self.pending.append(line)
+            size = self.log_size + sum(len(pending.encode('utf-8')) for pending in self.pending)
+        write_coalescer.mark_dirty(self)
+        return size
+    
+    def write_to_disk(self, fsync=False):
+        """Append queued records in a single write (called by the write coalescer)"""
+        try:
+            with self.lock:
+                self.write_pending(fsync)
+        except Exception as e:
+            log_error(f"Error saving journal entries: {str(e)}", 'journal', 'append')
+    
+    def write_pending(self, fsync):
+        """Append queued records to the log file; caller holds the lock"""
+        if not self.pending:
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write("".join(self.pending))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+            self.log_size = f.tell()
+        self.pending = []
+    
+    def needs_compaction(self, log_size):
+        """Check whether the log has grown past the compaction threshold"""
+        if log_size < self.compact_threshold:
+            return False
+        return not (self.compaction_thread and self.compaction_thread.is_alive())
+    
+    def compact(self, entries, background=True):
+        """Merge the log into a fresh snapshot of the given entries"""
+        with self.lock:
+            self.write_pending(write_coalescer.durability != 'none')
+            snapshot = [dict(entry) for entry in entries]
+            log_offset = self.log_size
+        
+        if background:
+            self.compaction_thread = threading.Thread(
+                target=self.background_compaction,
+                args=(snapshot, log_offset),
+                name="journal-compaction"
+            )
+            self.compaction_thread.start()
+        else:
+            self.write_snapshot(snapshot, log_offset)
+    
+    def background_compaction(self, snapshot, log_offset):
+        """Compaction thread body; the log stays valid if this fails"""
+        started = time.perf_counter()
+        try:
+            self.write_snapshot(snapshot, log_offset)
+        except Exception as e:
+            log_error(f"Error compacting journal log: {str(e)}", 'journal', 'compact')
+            return
+        log_event(logging.INFO, "Journal log compacted", 'journal', 'compact',
+                  (time.perf_counter() - started) * 1000, entries=len(snapshot))
+    
+    def write_snapshot(self, snapshot, log_offset):
+        """Write the snapshot file and drop the log records it now contains"""
+        fsync = write_coalescer.durability != 'none'
+        atomic_write_text(self.snapshot_file, json.dumps(snapshot, indent=4), fsync)
+        
+        # Keep only records appended while the snapshot was being written
+        with self.lock:
+            if not os.path.exists(self.log_file):
+                return
+            # Bytes, so log_size matches the f.tell() offsets appends use
+            with open(self.log_file, 'rb') as f:
+                f.seek(log_offset)
+                tail = f.read()
+            atomic_write_bytes(self.log_file, tail, fsync)
+            self.log_size = len(tail)
+
+
+# ================= JOURNAL SEARCH INDEX =================
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize_text(text):
+    """Split text into lowercase word tokens for searching"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+# How many items a long query walks between checks of its cancelled() callable
+CANCEL_CHECK_EVERY = 256
+
+
+def filter_entries(entries, keep, cancelled=None, limit=None):
+    """
+    The entries for which keep(entry) is true, in order, stopping after
+    limit of them if a limit is given
+    Returns: list, or None if cancelled() turned true part way through
+    """
+    if cancelled is None and limit is None:
+        return [e for e in entries if keep(e)]
+    
+    kept = []
+    for i, entry in enumerate(entries):
+        if cancelled is not None and i % CANCEL_CHECK_EVERY == 0 and cancelled():
+            return None
+        if keep(entry):
+            kept.append(entry)
+            if len(kept) == limit:
+                break
+    return kept
+
+
+class JournalSearchIndex:
+    """
+    Inverted index from word tokens to entry ids.
+    The vocabulary is kept sorted so a search word matches every token it is
+    a prefix of, which keeps partially typed words working.
+    """
+    
+    def __init__(self):
+        self.postings = {}
+        self.tokens = []
+    
+    def add(self, entry_id, text):
+        """Index the words of one entry"""
+        for token in set(tokenize_text(text)):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                bisect.insort(self.tokens, token)
+            ids.add(entry_id)
+    
+    def remove(self, entry_id, text):
+        """Drop one entry from the index"""
+        for token in set(tokenize_text(text)):
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(entry_id)
+            if not ids:
+                del self.postings[token]
+                del self.tokens[bisect.bisect_left(self.tokens, token)]
+    
+    def prefix_matches(self, prefix, cancelled=None):
+        """Ids of entries containing a token that starts with prefix"""
+        matches = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for i in range(start, len(self.tokens)):
+            token = self.tokens[i]
+            if not token.startswith(prefix):
+                break
+            # A short prefix can cover much of the vocabulary
+            if cancelled is not None and (i - start) % CANCEL_CHECK_EVERY == 0 and cancelled():
+                break
+            matches |= self.postings[token]
+        return matches
+    
+    def search(self, search_term, cancelled=None):
+        """
+        Ids of entries matching every word of the search term as a prefix.
+        Stops early once cancelled() is true, so callers passing it must
+        check it again before trusting the result.
+        Returns: set of ids, or None if the term has no searchable words
+        """
+        words = set(tokenize_text(search_term))
+        if not words:
+            return None
+        
+        result = None
+        # Longer words are usually rarer, so start with them to shrink the set early
+        for word in sorted(words, key=len, reverse=True):
+            if cancelled is not None and cancelled():
+                break
+            matches = self.prefix_matches(word, cancelled)
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
+
+
+# ================= JOURNAL TIMELINE INDEX =================
+def entry_sort_key(entry):
+    """Ordering key of an entry: timestamp, with the id breaking ties"""
+    return (entry.get('timestamp', ''), entry.get('id') or 0)
+
+
+def timestamp_bounds(start=None, end=None):
+    """
+    Turn an inclusive start/end (dates or timestamps) into sort-key bounds.
+    A bare end date covers that whole day.
+    """
+    start_key = (start,) if start else None
+    if end and len(end) == 10:
+        end += " 23:59:59"
+    end_key = (end, float('inf')) if end else None
+    return start_key, end_key
+
+
+class TimelineIndex:
+    """
+    Entries kept sorted by entry_sort_key.
+    Entries nearly always arrive in order, so inserting is usually a plain
+    append; range and page lookups are a bisect plus a slice.
+    """
+    
+    def __init__(self):
+        self.keys = []
+        self.entries = []
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def insert(self, entry):
+        """Add an entry at its place in the timeline"""
+        key = entry_sort_key(entry)
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.entries.append(entry)
+        else:
+            i = bisect.bisect_right(self.keys, key)
+            self.keys.insert(i, key)
+            self.entries.insert(i, entry)
+    
+    def remove(self, entry):
+        """Remove an entry whose sort key has not changed since insert"""
+        key = entry_sort_key(entry)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+            del self.entries[i]
+    
+    def newest_first(self):
+        """All entries, newest first"""
+        return self.entries[::-1]
+    
+    def between(self, start_key=None, end_key=None):
+        """Entries with start_key <= key <= end_key, oldest first"""
+        i = bisect.bisect_left(self.keys, start_key) if start_key else 0
+        j = bisect.bisect_right(self.keys, end_key) if end_key else len(self.keys)
+        return self.entries[i:j]
+    
+    def page_before(self, limit, cursor=None):
+        """Up to limit entries older than the cursor key, newest first"""
+        j = bisect.bisect_left(self.keys, tuple(cursor)) if cursor else len(self.keys)
+        return self.entries[max(0, j - limit):j][::-1]
+    
+    def walk_before(self, cursor=None):
+        """Iterate over the entries older than the cursor key, newest first"""
+        j = bisect.bisect_left(self.keys, tuple(cursor)) if cursor else len(self.keys)
+        return (self.entries[i] for i in range(j - 1, -1, -1))
+
+
+# ================= JOURNAL STORAGE BACKENDS =================
+class JournalStore(ABC):
+    """Interface shared by the journal storage backends"""
+    
+    @abstractmethod
+    def load(self):
+        """Load or open the stored journal"""
+    
+    @abstractmethod
+    def count(self):
+        """Number of stored entries"""
+    
+    @abstractmethod
+    def next_id(self):
+        """Id to use for the next new entry"""
+    
+    @abstractmethod
+    def all_entries(self):
+        """All entries in insertion order"""
+    
+    @abstractmethod
+    def add(self, entry):
+        """Store a new entry"""
+    
+    @abstractmethod
+    def update(self, entry_id, fields):
+        """Change fields of an existing entry"""
+    
+    @abstractmethod
+    def query(self, mood_filter=None, search_term=None, cancelled=None):
+        """
+        Entries matching the filters, newest first
+        cancelled, if given, is polled while the query runs; the query gives
+        up and returns None as soon as it returns true
+        """
+    
+    @abstractmethod
+    def between(self, start=None, end=None, mood_filter=None):
+        """Entries with timestamps in [start, end], oldest first"""
+    
+    @abstractmethod
+    def page(self, limit, cursor=None, mood_filter=None, search_term=None, cancelled=None):
+        """
+        Up to limit entries older than the (timestamp, id) cursor, newest first
+        Filters and cancelled work as in query()
+        """
+    
+    @abstractmethod
+    def stat_rows(self):
+        """(date, mood) of every entry in insertion order, for statistics"""
+    
+    def flush(self):
+        """Make sure everything written so far is persisted"""
+    
+    def close(self):
+        """Release any resources held by the store"""
+
+
+class LogJournalStore(JournalStore):
+    """Keeps entries in memory, persisted through the append-only JournalLog"""
+    
+    def __init__(self, journal_log=None):
+        self.journal_log = journal_log or JournalLog()
+        self.entries = []
+        self.by_id = {}
+        self.search_index = JournalSearchIndex()
+        self.timeline = TimelineIndex()
+        self.mood_timelines = {}
+    
+    def load(self):
+        self.entries = self.journal_log.load()
+        self.by_id = {entry.get('id'): entry for entry in self.entries}
+        self.search_index = JournalSearchIndex()
+        self.timeline = TimelineIndex()
+        self.mood_timelines = {}
+        for entry in self.entries:
+            self.index_entry(entry)
+    
+    def index_entry(self, entry):
+        """Add an entry to the search and timeline indexes"""
+        self.search_index.add(entry.get('id'), entry.get('entry', ''))
+        self.timeline.insert(entry)
+        mood = entry.get('mood', 'Unknown')
+        if mood not in self.mood_timelines:
+            self.mood_timelines[mood] = TimelineIndex()
+        self.mood_timelines[mood].insert(entry)
+    
+    def timeline_for(self, mood_filter):
+        """Timeline of all entries, or of one mood"""
+        if mood_filter:
+            return self.mood_timelines.get(mood_filter) or TimelineIndex()
+        return self.timeline
+    
+    def count(self):
+        return len(self.entries)
+    
+    def next_id(self):
+        return len(self.entries) + 1
+    
+    def all_entries(self):
+        return self.entries
+    
+    def add(self, entry):
+        self.entries.append(entry)
+        self.by_id[entry.get('id')] = entry
+        self.index_entry(entry)
+        self.append_record({'op': 'add', 'entry': entry})
+    
+    def update(self, entry_id, fields):
+        entry = self.by_id.get(entry_id)
+        if entry is None:
+            return False
+        if 'entry' in fields:
+            self.search_index.remove(entry_id, entry.get('entry', ''))
+            self.search_index.add(entry_id, fields['entry'])
+        
+        reorder = 'timestamp' in fields or 'mood' in fields
+        if reorder:
+            self.timeline.remove(entry)
+            self.timeline_for(entry.get('mood', 'Unknown')).remove(entry)
+        entry.update(fields)
+        if reorder:
+            self.timeline.insert(entry)
+            self.mood_timelines.setdefault(entry.get('mood', 'Unknown'), TimelineIndex()).insert(entry)
+        self.append_record({'op': 'update', 'id': entry_id, 'fields': fields})
+        return True
+    
+    def append_record(self, record):
+        """Append a change to the journal log, compacting it when it gets large"""
+        log_size = self.journal_log.append(record)
+        if self.journal_log.needs_compaction(log_size):
+            self.journal_log.compact(self.entries)
+    
+    def query(self, mood_filter=None, search_term=None, cancelled=None):
+        timeline = self.timeline_for(mood_filter)
+        if not search_term:
+            return timeline.newest_first()
+        
+        ids = self.search_index.search(search_term, cancelled)
+        if cancelled is not None and cancelled():
+            return None
+        if ids is None:
+            # Nothing word-like to look up (e.g. only punctuation)
+            search_lower = search_term.lower()
+            return filter_entries(timeline.newest_first(),
+                                  lambda e: search_lower in e.get('entry', '').lower(), cancelled)
+        
+        # A handful of matches is cheaper to sort than walking the timeline
+        if len(ids) * 8 < len(timeline):
+            matches = [self.by_id[entry_id] for entry_id in ids]
+            if mood_filter:
+                matches = [e for e in matches if e.get('mood') == mood_filter]
+            return sorted(matches, key=entry_sort_key, reverse=True)
+        return filter_entries(timeline.newest_first(), lambda e: e.get('id') in ids, cancelled)
+    
+    def between(self, start=None, end=None, mood_filter=None):
+        return self.timeline_for(mood_filter).between(*timestamp_bounds(start, end))
+    
+    def page(self, limit, cursor=None, mood_filter=None, search_term=None, cancelled=None):
+        timeline = self.timeline_for(mood_filter)
+        if not search_term:
+            return timeline.page_before(limit, cursor)
+        
+        ids = self.search_index.search(search_term, cancelled)
+        if cancelled is not None and cancelled():
+            return None
+        if ids is None:
+            search_lower = search_term.lower()
+            keep = lambda e: search_lower in e.get('entry', '').lower()
+        elif len(ids) * 8 < len(timeline):
+            # As in query(), sort a handful of matches rather than walk the timeline
+            matches = [self.by_id[entry_id] for entry_id in ids]
+            if mood_filter:
+                matches = [e for e in matches if e.get('mood') == mood_filter]
+            if cursor:
+                matches = [e for e in matches if entry_sort_key(e) < tuple(cursor)]
+            return sorted(matches, key=entry_sort_key, reverse=True)[:limit]
+        else:
+            keep = lambda e: e.get('id') in ids
+        return filter_entries(timeline.walk_before(cursor), keep, cancelled, limit)
+    
+    def stat_rows(self):
+        return [(e.get('date', ''), e.get('mood', 'Unknown')) for e in self.entries]
+    
+    def flush(self):
+        self.journal_log.compact(self.entries, background=False)
+
+
+class SqliteJournalStore(JournalStore):
+    """
+    Stores entries in a SQLite database so nothing has to be held in memory.
+    Filters run against indexes on date, mood and timestamp, and text search
+    uses an FTS5 table when the SQLite build supports it.
+    """
+    
+    COLUMNS = ('id', 'timestamp', 'date', 'mood', 'entry', 'email_sent', 'days_together')
+    # SQLite virtual machine steps between checks of a query's cancelled()
+    CANCEL_CHECK_STEPS = 10000
+    
+    def __init__(self, db_file=JOURNAL_DB_FILE):
+        self.db_file = db_file
+        self.conn = None
+        self.fts_enabled = False
+        self.lock = threading.Lock()
+    
+    def load(self):
+        load_sqlite_module()
+        
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # Match SQLite's syncing to the app-wide durability mode
+            synchronous = {'always': 'FULL', 'batch': 'NORMAL', 'none': 'OFF'}
+            self.conn.execute(f"PRAGMA synchronous={synchronous[write_coalescer.durability]}")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id INTEGER PRIMARY KEY,"
+                " timestamp TEXT NOT NULL,"
+                " date TEXT NOT NULL,"
+                " mood TEXT NOT NULL,"
+                " entry TEXT NOT NULL,"
+                " email_sent INTEGER NOT NULL DEFAULT 0,"
+                " days_together INTEGER)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_mood ON entries(mood)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp)")
+            self.fts_enabled = self.create_fts_table()
+    
+    def create_fts_table(self):
+        """Create the full-text index; returns False if FTS5 is unavailable"""
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+                " entry, content='entries', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        
+        # Keep the external-content FTS table in step with the entries table
+        self.conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN"
+            " INSERT INTO entries_fts(rowid, entry) VALUES (new.id, new.entry); END"
+        )
+        self.conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN"
+            " INSERT INTO entries_fts(entries_fts, rowid, entry) VALUES ('delete', old.id, old.entry); END"
+        )
+        self.conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF entry ON entries BEGIN"
+            " INSERT INTO entries_fts(entries_fts, rowid, entry) VALUES ('delete', old.id, old.entry);"
+            " INSERT INTO entries_fts(rowid, entry) VALUES (new.id, new.entry); END"
+        )
+        return True
+    
+    def row_to_entry(self, row):
+        entry = dict(row)
+        entry['email_sent'] = bool(entry['email_sent'])
+        return entry
+    
+    def fetch(self, sql, params=(), cancelled=None):
+        """
+        Run a SELECT and return its rows as entries
+        If cancelled is given SQLite polls it while the statement runs and
+        aborts the statement once it returns true; fetch then returns None.
+        """
+        with self.lock:
+            if cancelled is None:
+                rows = self.conn.execute(sql, params).fetchall()
+            else:
+                self.conn.set_progress_handler(cancelled, self.CANCEL_CHECK_STEPS)
+                try:
+                    rows = self.conn.execute(sql, params).fetchall()
+                except sqlite3.OperationalError:
+                    if not cancelled():
+                        raise
+                    return None
+                finally:
+                    self.conn.set_progress_handler(None, 0)
+        return [self.row_to_entry(row) for row in rows]
+    
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    def next_id(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM entries").fetchone()[0]
+    
+    def all_entries(self):
+        return self.fetch("SELECT * FROM entries ORDER BY id")
+    
+    def add(self, entry):
+        self.add_many([entry])
+    
+    def add_many(self, entries):
+        """Insert several entries in one transaction, skipping known ids"""
+        rows = [
+            (e.get('id'), e.get('timestamp', ''), e.get('date', ''), e.get('mood', 'Unknown'),
+             e.get('entry', ''), int(bool(e.get('email_sent'))), e.get('days_together'))
+            for e in entries
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO entries"
+                " (id, timestamp, date, mood, entry, email_sent, days_together)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    
+    def update(self, entry_id, fields):
+        fields = {k: v for k, v in fields.items() if k in self.COLUMNS and k != 'id'}
+        if not fields:
+            return False
+        if 'email_sent' in fields:
+            fields['email_sent'] = int(bool(fields['email_sent']))
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE entries SET {assignments} WHERE id = ?",
+                list(fields.values()) + [entry_id]
+            )
+        return cursor.rowcount > 0
+    
+    def match_expression(self, search_term):
+        """Turn free text into an FTS5 query matching every word as a prefix"""
+        words = tokenize_text(search_term)
+        return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+    
+    def filter_conditions(self, mood_filter=None, search_term=None):
+        """WHERE conditions and their parameters for the mood and text filters"""
+        conditions = []
+        params = []
+        
+        if mood_filter:
+            conditions.append("mood = ?")
+            params.append(mood_filter)
+        
+        if search_term:
+            match = self.match_expression(search_term) if self.fts_enabled else ""
+            if match:
+                conditions.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+                params.append(match)
+            else:
+                conditions.append("instr(lower(entry), ?) > 0")
+                params.append(search_term.lower())
+        return conditions, params
+    
+    def query(self, mood_filter=None, search_term=None, cancelled=None):
+        conditions, params = self.filter_conditions(mood_filter, search_term)
+        
+        sql = "SELECT * FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        return self.fetch(sql, params, cancelled)
+    
+    def between(self, start=None, end=None, mood_filter=None):
+        start_key, end_key = timestamp_bounds(start, end)
+        conditions = []
+        params = []
+        if start_key:
+            conditions.append("timestamp >= ?")
+            params.append(start_key[0])
+        if end_key:
+            conditions.append("timestamp <= ?")
+            params.append(end_key[0])
+        if mood_filter:
+            conditions.append("mood = ?")
+            params.append(mood_filter)
+        
+        sql = "SELECT * FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp, id"
+        return self.fetch(sql, params)
+    
+    def page(self, limit, cursor=None, mood_filter=None, search_term=None, cancelled=None):
+        conditions, params = self.filter_conditions(mood_filter, search_term)
+        if cursor:
+            timestamp, entry_id = cursor
+            conditions.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([timestamp, timestamp, entry_id])
+        
+        sql = "SELECT * FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        return self.fetch(sql, params + [limit], cancelled)
+    
+    def stat_rows(self):
+        with self.lock:
+            return [tuple(row) for row in self.conn.execute("SELECT date, mood FROM entries ORDER BY id")]
+    
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+    
+    def close(self):
+        if self.conn is not None:
+            with self.lock:
+                self.conn.close()
+            self.conn = None
+
+
+def migrate_json_to_sqlite(snapshot_file=JOURNAL_FILE, log_file=JOURNAL_LOG_FILE,
+                           db_file=JOURNAL_DB_FILE):
+    """
+    One-shot copy of the JSON journal (snapshot plus log) into SQLite
+    Returns: number of entries read from the JSON journal
+    """
+    entries = JournalLog(snapshot_file, log_file).load()
+    store = SqliteJournalStore(db_file)
+    store.load()
+    try:
+        store.add_many(entries)
+    finally:
+        store.close()
+    return len(entries)
+
+
+def create_journal_store(backend='log'):
+    """Create the storage backend named in settings ('log' or 'sqlite')"""
+    if backend == 'sqlite':
+        # First switch to SQLite: bring the existing JSON journal along
+        has_json = os.path.exists(JOURNAL_FILE) or os.path.exists(JOURNAL_LOG_FILE)
+        if not os.path.exists(JOURNAL_DB_FILE) and has_json:
+            migrate_json_to_sqlite()
+        return SqliteJournalStore()
+    return LogJournalStore()
+
+
+# ================= JOURNAL STATISTICS =================
+class JournalStatistics:
+    """
+    Journal statistics kept up to date one entry at a time.
+    Consecutive writing days are tracked as runs keyed by their first and
+    last day, so adding a day merges at most two runs and the streaks never
+    need the full date list again.
+    """
+    
+    def __init__(self):
+        self.total_entries = 0
+        self.first_entry_date = None
+        self.mood_counts = {}
+        # Ties go to the mood seen first, as max() over mood_counts would
+        self.mood_order = {}
+        self.most_common_mood = None
+        self.mood_last_seen = {}
+        self.entries_per_month = {}
+        self.days = set()
+        self.run_start_by_end = {}
+        self.run_end_by_start = {}
+        self.latest_day = None
+        self.longest_streak = 0
+    
+    def add(self, entry_date, mood):
+        """Count one new entry"""
+        self.total_entries += 1
+        if self.first_entry_date is None:
+            self.first_entry_date = entry_date
+        
+        count = self.mood_counts.get(mood, 0) + 1
+        self.mood_counts[mood] = count
+        self.mood_order.setdefault(mood, len(self.mood_order))
+        best = self.most_common_mood
+        if (best is None or count > self.mood_counts[best]
+                or (count == self.mood_counts[best] and self.mood_order[mood] < self.mood_order[best])):
+            self.most_common_mood = mood
+        if entry_date > self.mood_last_seen.get(mood, ''):
+            self.mood_last_seen[mood] = entry_date
+        
+        month = entry_date[:7]
+        self.entries_per_month[month] = self.entries_per_month.get(month, 0) + 1
+        
+        try:
+            day = date.fromisoformat(entry_date).toordinal()
+        except ValueError:
+            return
+        self.add_day(day)
+    
+    def add_day(self, day):
+        """Record a writing day, merging it with neighbouring runs"""
+        if day in self.days:
+            return
+        self.days.add(day)
+        
+        start = self.run_start_by_end.pop(day - 1, day)
+        end = self.run_end_by_start.pop(day + 1, day)
+        self.run_end_by_start[start] = end
+        self.run_start_by_end[end] = start
+        
+        self.longest_streak = max(self.longest_streak, end - start + 1)
+        if self.latest_day is None or day > self.latest_day:
+            self.latest_day = day
+    
+    def current_streak(self):
+        """Length of the run of consecutive days ending at the newest entry"""
+        if self.latest_day is None:
+            return 0
+        return self.latest_day - self.run_start_by_end[self.latest_day] + 1
+    
+    def snapshot(self):
+        """Statistics dictionary for display"""
+        if not self.total_entries:
+            return {
+                'total_entries': 0,
+                'writing_streak': 0,
+                'longest_streak': 0,
+                'most_common_mood': 'N/A',
+                'first_entry_date': 'N/A',
+                'mood_counts': {},
+                'mood_last_seen': {},
+                'entries_per_month': {}
+            }
+        
+        return {
+            'total_entries': self.total_entries,
+            'writing_streak': self.current_streak(),
+            'longest_streak': self.longest_streak,
+            'most_common_mood': self.most_common_mood,
+            'first_entry_date': self.first_entry_date or 'N/A',
+            'mood_counts': dict(self.mood_counts),
+            'mood_last_seen': dict(self.mood_last_seen),
+            'entries_per_month': dict(self.entries_per_month)
+        }
 
 
 # ================= JOURNAL MANAGER CLASS =================
 class JournalManager:
     """Manages journal entries and statistics"""
     
-    def __init__(self):
-        self.entries = self.load_entries()
-        self.email_notifier = EmailNotifier()
+    def __init__(self, backend='log', store=None, email_notifier=None):
+        # Guards the store and statistics; history searches run on a worker thread
+        self.lock = threading.RLock()
+        self.store = store or self.create_store(backend)
+        self.load_entries()
+        self.email_notifier = email_notifier or EmailNotifier()
+        self.listeners = []
+        # Emails queued before the last exit start draining right away
+        self.email_outbox = EmailOutbox(self.email_notifier, on_done=self.email_finished)
+        self.email_outbox.start()
+        metrics.gauge('journal_entries').func = lambda: self.statistics.total_entries
+        metrics.gauge('email_outbox_pending').func = self.email_outbox.pending_count
+    
+    @property
+    def entries(self):
+        """All journal entries in the order they were written"""
+        return self.store.all_entries()
+    
+    def create_store(self, backend):
+        """Create the storage backend, falling back to the JSON log on errors"""
+        try:
+            return create_journal_store(backend)
+        except Exception as e:
+            log_error(f"Error opening {backend} journal store: {str(e)}", 'journal', 'open')
+            return LogJournalStore()
     
     def load_entries(self):
-        """Load journal entries from file"""
+        """Load journal entries from the storage backend"""
+        self.statistics = JournalStatistics()
+        started = time.perf_counter()
         try:
-            if os.path.exists(JOURNAL_FILE):
-                with open(JOURNAL_FILE, 'r') as f:
-                    return json.load(f)
-            return []
+            self.store.load()
+            for entry_date, mood in self.store.stat_rows():
+                self.statistics.add(entry_date, mood)
         except Exception as e:
-            self.log_error(f"Error loading journal entries: {str(e)}")
-            return []
+            log_error(f"Error loading journal entries: {str(e)}", 'journal', 'load')
+            return False
+        log_event(logging.INFO, "Journal loaded", 'journal', 'load',
+                  (time.perf_counter() - started) * 1000, entries=self.statistics.total_entries)
+        return True
     
     def save_entries(self):
-        """Save journal entries to file"""
+        """Flush all journal entries to disk"""
         try:
-            with open(JOURNAL_FILE, 'w') as f:
-                json.dump(self.entries, f, indent=4)
+            self.store.flush()
             return True
         except Exception as e:
-            self.log_error(f"Error saving journal entries: {str(e)}")
+            log_error(f"Error saving journal entries: {str(e)}", 'journal', 'flush')
             return False
     
+    def next_id(self):
+        with self.lock:
+            return self.store.next_id()
+    
     def add_entry(self, mood, entry_text, days_together):
-        """Add a new journal entry"""
+        """
+        Add a new journal entry
+        Returns: (success: bool, message: str, email_queued: bool); a queued
+        email is reported later to the add_listener() callbacks
+        """
         now = datetime.now()
         new_entry = {
-            "id": len(self.entries) + 1,
+            "id": self.next_id(),
             "timestamp": now.strftime('%Y-%m-%d %H:%M:%S'),
             "date": now.strftime('%Y-%m-%d'),
             "mood": mood,
@@ -206,78 +2039,89 @@ class JournalManager:
             "days_together": days_together
         }
         
-        self.entries.append(new_entry)
-        
-        # Try to send email
-        success, message = self.email_notifier.send_journal_notification(new_entry)
-        new_entry['email_sent'] = success
+        # Save right away; the email flag is updated once delivery finishes
+        with self.lock:
+            try:
+                self.store.add(new_entry)
+            except Exception as e:
+                log_error(f"Error saving journal entries: {str(e)}", 'journal', 'add')
+                return (False, "Couldn't save your entry, please try again", False)
+            self.statistics.add(new_entry['date'], mood)
+        metrics.counter('journal_entries_saved_total').inc()
         
-        # Save regardless of email status
-        self.save_entries()
+        ready, message = self.email_notifier.check_ready()
+        if ready:
+            self.email_outbox.enqueue(new_entry)
+            message = "Sending email..."
         
-        return (True, message, success)
+        return (True, message, ready)
     
-    def get_entries(self, mood_filter=None, search_term=None):
-        """Get filtered journal entries"""
-        filtered = self.entries
-        
-        if mood_filter and mood_filter != "All Moods":
-            filtered = [e for e in filtered if e.get('mood') == mood_filter]
-        
-        if search_term:
-            search_lower = search_term.lower()
-            filtered = [e for e in filtered if search_lower in e.get('entry', '').lower()]
-        
-        return sorted(filtered, key=lambda x: x.get('timestamp', ''), reverse=True)
+    def add_listener(self, callback):
+        """
+        Register callback(entry_id, email_sent, message) for finished email
+        deliveries. It is called from the delivery thread.
+        """
+        self.listeners.append(callback)
     
-    def get_statistics(self):
-        """Calculate journal statistics"""
-        if not self.entries:
-            return {
-                'total_entries': 0,
-                'writing_streak': 0,
-                'most_common_mood': 'N/A',
-                'first_entry_date': 'N/A'
-            }
-        
-        # Count moods
-        mood_counts = {}
-        for entry in self.entries:
-            mood = entry.get('mood', 'Unknown')
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
-        
-        most_common_mood = max(mood_counts.items(), key=lambda x: x[1])[0] if mood_counts else 'N/A'
-        
-        # Calculate streak (consecutive days)
-        dates = sorted(set(e.get('date', '') for e in self.entries), reverse=True)
-        streak = 0
-        if dates:
-            today = datetime.now().strftime('%Y-%m-%d')
-            current_date = datetime.strptime(dates[0], '%Y-%m-%d')
-            
-            for date_str in dates:
-                entry_date = datetime.strptime(date_str, '%Y-%m-%d')
-                if (current_date - entry_date).days <= 1:
-                    streak += 1
-                    current_date = entry_date
-                else:
-                    break
-        
-        return {
-            'total_entries': len(self.entries),
-            'writing_streak': streak,
-            'most_common_mood': most_common_mood,
-            'first_entry_date': self.entries[0].get('date', 'N/A') if self.entries else 'N/A'
-        }
+    def email_finished(self, entry_id, success, message):
+        """Record the outcome of a background email delivery"""
+        if success:
+            with self.lock:
+                try:
+                    self.store.update(entry_id, {'email_sent': True})
+                except Exception as e:
+                    log_error(f"Error saving journal entries: {str(e)}", 'journal', 'update')
+        for callback in list(self.listeners):
+            callback(entry_id, success, message)
+    
+    def get_entries(self, mood_filter=None, search_term=None, cancelled=None):
+        """
+        Get filtered journal entries
+        cancelled is an optional callable; once it returns true the query
+        stops early, releasing the lock, and None is returned instead
+        """
+        if mood_filter == "All Moods":
+            mood_filter = None
+        started = time.perf_counter()
+        with self.lock:
+            entries = self.store.query(mood_filter=mood_filter, search_term=search_term,
+                                       cancelled=cancelled)
+        if entries is not None:
+            metrics.histogram('journal_search_seconds').observe_ms((time.perf_counter() - started) * 1000)
+        return entries
+    
+    def get_entries_between(self, start=None, end=None, mood_filter=None):
+        """
+        Entries written between start and end (inclusive), oldest first
+        start/end may be dates ('2024-01-31') or full timestamps
+        """
+        if mood_filter == "All Moods":
+            mood_filter = None
+        with self.lock:
+            return self.store.between(start, end, mood_filter=mood_filter)
     
-    def log_error(self, message):
-        """Log errors to file"""
-        try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(ERROR_LOG_FILE, 'a') as f:
-                f.write(f"[{timestamp}] {message}\n")
-        except:
-            pass
+    def get_entries_page(self, limit=10, cursor=None, mood_filter=None, search_term=None,
+                         cancelled=None):
+        """
+        Keyset pagination over filtered entries, newest first
+        Returns: (entries, next_cursor) - pass next_cursor back for the
+        following page; it is None once there are no more entries.
+        None instead if cancelled() turned true, as in get_entries.
+        """
+        if mood_filter == "All Moods":
+            mood_filter = None
+        with self.lock:
+            page = self.store.page(limit, cursor, mood_filter=mood_filter, search_term=search_term,
+                                   cancelled=cancelled)
+        if page is None:
+            return None
+        next_cursor = entry_sort_key(page[-1]) if len(page) == limit else None
+        return (page, next_cursor)
+    
+    def get_statistics(self):
+        """Current journal statistics, served from the incremental counters"""
+        with self.lock:
+            return self.statistics.snapshot()
 
 
 # ================= SETTINGS MANAGER =================
@@ -285,6 +2129,8 @@ class SettingsManager:
     """Manages application settings"""
     
     def __init__(self):
+        # set() runs on the Tk thread, saving on the write coalescer's thread
+        self.lock = threading.Lock()
         self.settings = self.load_settings()
     
     def load_settings(self):
@@ -293,7 +2139,16 @@ class SettingsManager:
             'theme': 'light',
             'font_size': 'medium',
             'animations_enabled': True,
-            'accent_color': COLORS['primary']
+            'accent_color': COLORS['primary'],
+            'journal_backend': 'log',
+            'write_durability': 'batch',
+            'prebuild_tabs': True,
+            'trace_callbacks': False,
+            'stall_threshold_ms': STALL_THRESHOLD_MS,
+            'metrics_port': METRICS_PORT,
+            'metrics_snapshot_interval': METRICS_SNAPSHOT_INTERVAL,
+            'record_replays': True,
+            'log_level': 'WARNING'
         }
         
         try:
@@ -306,25 +2161,850 @@ class SettingsManager:
         
         return default_settings
     
-    def save_settings(self):
+    def save_settings(self, fsync=True):
         """Save settings to file"""
+        with self.lock:
+            settings = dict(self.settings)
         try:
-            with open(SETTINGS_FILE, 'w') as f:
-                json.dump(self.settings, f, indent=4)
+            atomic_write_text(SETTINGS_FILE, json.dumps(settings, indent=4), fsync)
             return True
         except:
             return False
     
+    def write_to_disk(self, fsync=False):
+        """Called by the write coalescer once a batch of changes is due"""
+        self.save_settings(fsync)
+    
     def get(self, key, default=None):
         """Get a setting value"""
         return self.settings.get(key, default)
     
     def set(self, key, value):
         """Set a setting value"""
-        self.settings[key] = value
-        self.save_settings()
+        with self.lock:
+            self.settings[key] = value
+        write_coalescer.mark_dirty(self)
+
+
+# ================= ACHIEVEMENT MANAGER =================
+class AchievementManager:
+    """
+    Unlocked achievements, shared by the whole app.
+    The file is read the first time anything asks and kept in a set after
+    that. Unlocks are written behind by the write coalescer, so a game frame
+    never waits on the disk, and listeners (an open achievements window)
+    are told straight away.
+    """
+    
+    def __init__(self, path=ACHIEVEMENTS_FILE):
+        self.path = path
+        self.unlocked = None
+        self.listeners = []
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Read the unlocked scores from disk, once"""
+        if self.unlocked is not None:
+            return
+        unlocked = set()
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    unlocked = {int(score) for score in json.load(f)}
+        except Exception as e:
+            log_error(f"Error loading achievements: {str(e)}", 'achievements', 'load')
+        self.unlocked = unlocked
+    
+    def is_unlocked(self, score):
+        self.load()
+        return score in self.unlocked
+    
+    def unlocked_scores(self):
+        self.load()
+        return sorted(self.unlocked)
+    
+    def unlock(self, score):
+        """Unlock an achievement; returns True if it was newly unlocked"""
+        self.load()
+        if score not in achievements or score in self.unlocked:
+            return False
+        with self.lock:
+            self.unlocked.add(score)
+        write_coalescer.mark_dirty(self)
+        
+        for listener in list(self.listeners):
+            try:
+                listener(score)
+            except Exception as e:
+                log_error(f"Error notifying achievement listener: {str(e)}", 'achievements', 'notify')
+        return True
+    
+    def add_listener(self, callback):
+        """callback(score) is called on every new unlock"""
+        self.listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def write_to_disk(self, fsync=False):
+        """Called by the write coalescer once a batch of changes is due"""
+        with self.lock:
+            data = json.dumps(sorted(self.unlocked))
+        try:
+            atomic_write_text(self.path, data, fsync)
+        except Exception as e:
+            log_error(f"Error saving achievements: {str(e)}", 'achievements', 'save')
+
+
+achievement_manager = AchievementManager()
+
+
+
+
+# ================= GAME LOOP =================
+# Flappy game physics in pixels and seconds. The values match the original
+# per-tick numbers at 30 ms a tick (gravity 0.25, flap -5, pipes 3 px a tick).
+GAME_STEP_MS = 1000 / 60
+GAME_FRAME_MS = 16
+GAME_GRAVITY = 0.25 / 0.03 ** 2
+GAME_FLAP_VELOCITY = -5 / 0.03
+GAME_PIPE_SPEED = 3 / 0.03
+# Seconds between pipes, picked uniformly; averages the old 1.2%-a-tick chance
+GAME_PIPE_INTERVAL = (1.8, 3.2)
+
+
+class FixedTimestepClock:
+    """
+    Accumulator for a fixed-timestep loop. Each rendered frame calls
+    advance() with the current time and runs the number of simulation steps
+    it returns, so the game runs at the same speed however late Tk delivers
+    frames. After a long hitch at most max_steps are run and the rest of the
+    backlog is dropped, so the game slows down instead of jumping ahead.
+    """
+    
+    MAX_STEPS_PER_FRAME = 5
+    
+    def __init__(self, step_ms=GAME_STEP_MS, max_steps=MAX_STEPS_PER_FRAME):
+        self.step_ms = step_ms
+        self.step_seconds = step_ms / 1000
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.started = None
+        self.last = None
+        self.frames = 0
+        self.steps = 0
+        self.dropped_steps = 0
+        self.frame_times = LatencyHistogram()
+    
+    def advance(self, now):
+        """Record a frame at time now (seconds); returns the steps to simulate"""
+        if self.last is None:
+            self.started = self.last = now
+            return 0
+        
+        frame_ms = (now - self.last) * 1000
+        self.last = now
+        self.frames += 1
+        self.frame_times.record(frame_ms)
+        
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+        self.steps += steps
+        return steps
+    
+    def fps(self):
+        if not self.frames or self.last == self.started:
+            return 0.0
+        return self.frames / (self.last - self.started)
+    
+    def report(self):
+        return (
+            f"{self.fps():.0f} FPS over {self.frames} frames, frame time "
+            f"p50 {self.frame_times.percentile(0.5):.0f} ms, "
+            f"p95 {self.frame_times.percentile(0.95):.0f} ms, "
+            f"p99 {self.frame_times.percentile(0.99):.0f} ms, "
+            f"max {self.frame_times.max_ms:.0f} ms; {self.dropped_steps} steps dropped"
+        )
+
+
+class Pipe:
+    """One pipe pair: left edge x and the open gap between gap_top and gap_bottom"""
+    
+    __slots__ = ('x', 'gap_top', 'gap_bottom', 'scored')
+    
+    def __init__(self, x, gap_top, gap_bottom):
+        self.x = x
+        self.gap_top = gap_top
+        self.gap_bottom = gap_bottom
+        self.scored = False
+
+
+class FlappyModel:
+    """
+    Game state as plain numbers: the player's height and velocity and the
+    pipes in a deque ordered left to right. step() advances the game and
+    returns what happened, as (event, pipe) pairs, for the view to draw:
+    'spawn', 'score', 'remove' and 'crash'.
+    """
+    
+    WIDTH = 400
+    HEIGHT = 450
+    PLAYER_X = 80
+    PLAYER_START_Y = 225
+    # Half size of the player's hit box, a little inside the 32 px heart sprite
+    PLAYER_HALF_WIDTH = 14
+    PLAYER_HALF_HEIGHT = 16
+    CEILING = 15
+    FLOOR = 435
+    PIPE_WIDTH = 50
+    PIPE_GAP = 200
+    GAP_CENTER_RANGE = (130, 300)
+    
+    def __init__(self, rng=None, pipe_gap=PIPE_GAP, pipe_interval=GAME_PIPE_INTERVAL):
+        self.rng = rng or random.Random()
+        self.pipe_gap = pipe_gap
+        self.pipe_interval = pipe_interval
+        self.y = self.PLAYER_START_Y
+        self.velocity = 0.0
+        self.pipes = deque()
+        self.score = 0
+        self.time = 0.0
+        self.steps = 0
+        self.alive = True
+        self.next_pipe_at = self.rng.uniform(*pipe_interval)
+    
+    def flap(self):
+        if self.alive:
+            self.velocity = GAME_FLAP_VELOCITY
+    
+    def step(self, dt):
+        """Advance the game by dt seconds"""
+        events = []
+        if not self.alive:
+            return events
+        self.time += dt
+        self.steps += 1
+        
+        self.velocity += GAME_GRAVITY * dt
+        self.y += self.velocity * dt
+        
+        dx = GAME_PIPE_SPEED * dt
+        for pipe in self.pipes:
+            pipe.x -= dx
+            if not pipe.scored and pipe.x + self.PIPE_WIDTH < self.PLAYER_X:
+                pipe.scored = True
+                self.score += 1
+                events.append(('score', pipe))
+        
+        while self.pipes and self.pipes[0].x + self.PIPE_WIDTH < 0:
+            events.append(('remove', self.pipes.popleft()))
+        
+        if self.collides():
+            self.alive = False
+            events.append(('crash', None))
+            return events
+        
+        # Pipes come on a schedule of game time, not per frame
+        if self.time >= self.next_pipe_at:
+            events.append(('spawn', self.spawn_pipe()))
+            self.next_pipe_at = self.time + self.rng.uniform(*self.pipe_interval)
+        return events
+    
+    def spawn_pipe(self):
+        gap_center = self.rng.randint(*self.GAP_CENTER_RANGE)
+        pipe = Pipe(self.WIDTH, gap_center - self.pipe_gap // 2, gap_center + self.pipe_gap // 2)
+        self.pipes.append(pipe)
+        return pipe
+    
+    def collides(self):
+        """Axis-aligned box test of the player against the walls and pipes"""
+        if self.y < self.CEILING or self.y > self.FLOOR:
+            return True
+        
+        left = self.PLAYER_X - self.PLAYER_HALF_WIDTH
+        right = self.PLAYER_X + self.PLAYER_HALF_WIDTH
+        top = self.y - self.PLAYER_HALF_HEIGHT
+        bottom = self.y + self.PLAYER_HALF_HEIGHT
+        for pipe in self.pipes:
+            if pipe.x >= right:
+                break  # Pipes are ordered by x; the rest are further right
+            if pipe.x + self.PIPE_WIDTH > left and (top < pipe.gap_top or bottom > pipe.gap_bottom):
+                return True
+        return False
+
+
+def autopilot(model, aim=25, noise=0.0, rng=None):
+    """
+    Simple scripted player: flap when falling below a point just under the
+    centre of the next gap. noise (pixels) blurs the aim to model a less
+    careful player. Returns True to flap.
+    """
+    left = model.PLAYER_X - model.PLAYER_HALF_WIDTH
+    target = model.PLAYER_START_Y
+    for pipe in model.pipes:
+        if pipe.x + model.PIPE_WIDTH >= left:
+            target = (pipe.gap_top + pipe.gap_bottom) / 2
+            break
+    target += aim
+    if noise:
+        target += (rng or model.rng).gauss(0, noise)
+    return model.y > target and model.velocity > 0
+
+
+class FlappySimulator:
+    """
+    Plays the game headless with a scripted policy. The same seed and
+    settings always give the same game, so results can be compared between
+    runs and used to tune gap size and pipe spacing.
+    """
+    
+    def __init__(self, seed=None, pipe_gap=FlappyModel.PIPE_GAP,
+                 pipe_interval=GAME_PIPE_INTERVAL, policy=autopilot, step_ms=GAME_STEP_MS):
+        self.model = FlappyModel(random.Random(seed), pipe_gap, pipe_interval)
+        self.policy = policy
+        self.dt = step_ms / 1000
+    
+    def run(self, max_seconds=60):
+        """Play until a crash or max_seconds of game time"""
+        model = self.model
+        steps = int(max_seconds / self.dt)
+        for _ in range(steps):
+            if self.policy(model):
+                model.flap()
+            model.step(self.dt)
+            if not model.alive:
+                break
+        return {
+            'score': model.score,
+            'time': round(model.time, 3),
+            'crashed': not model.alive,
+            'achievements': [score for score in sorted(achievements) if score <= model.score]
+        }
+
+
+class FlappyBatch:
+    """
+    Many independent games stepped together with NumPy arrays, one row per
+    game and up to MAX_PIPES pipe slots each. Same rules as FlappyModel and
+    the autopilot policy; the random stream differs, so a seed reproduces
+    a batch but not the matching FlappySimulator game.
+    Needs NumPy; simulate_games() falls back to FlappySimulator without it.
+    """
+    
+    MAX_PIPES = 4
+    
+    def __init__(self, count, seed=None, pipe_gap=FlappyModel.PIPE_GAP,
+                 pipe_interval=GAME_PIPE_INTERVAL, aim=25, noise=0.0):
+        import numpy as np
+        
+        self.np = np
+        self.rng = np.random.default_rng(seed)
+        self.pipe_gap = pipe_gap
+        self.pipe_interval = pipe_interval
+        self.aim = aim
+        self.noise = noise
+        
+        self.y = np.full(count, float(FlappyModel.PLAYER_START_Y))
+        self.velocity = np.zeros(count)
+        self.time = np.zeros(count)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.alive = np.ones(count, dtype=bool)
+        self.next_pipe_at = self.rng.uniform(*pipe_interval, size=count)
+        
+        shape = (count, self.MAX_PIPES)
+        self.pipe_x = np.zeros(shape)
+        self.gap_top = np.zeros(shape)
+        self.gap_bottom = np.zeros(shape)
+        self.active = np.zeros(shape, dtype=bool)
+        self.scored = np.zeros(shape, dtype=bool)
+    
+    def policy(self):
+        """Vectorized autopilot(); returns the games that flap this step"""
+        np = self.np
+        m = FlappyModel
+        ahead = self.active & (self.pipe_x + m.PIPE_WIDTH >= m.PLAYER_X - m.PLAYER_HALF_WIDTH)
+        nearest = np.where(ahead, self.pipe_x, np.inf).argmin(axis=1)
+        rows = np.arange(len(self.y))
+        centre = (self.gap_top[rows, nearest] + self.gap_bottom[rows, nearest]) / 2
+        target = np.where(ahead.any(axis=1), centre, m.PLAYER_START_Y) + self.aim
+        if self.noise:
+            target = target + self.rng.normal(0, self.noise, size=len(self.y))
+        return (self.y > target) & (self.velocity > 0)
+    
+    def step(self, dt, flap=None):
+        """Advance every live game by dt seconds"""
+        np = self.np
+        m = FlappyModel
+        alive = self.alive
+        if flap is not None:
+            self.velocity = np.where(flap & alive, GAME_FLAP_VELOCITY, self.velocity)
+        
+        self.time += np.where(alive, dt, 0.0)
+        self.velocity += np.where(alive, GAME_GRAVITY * dt, 0.0)
+        self.y += np.where(alive, self.velocity * dt, 0.0)
+        
+        moving = self.active & alive[:, None]
+        self.pipe_x -= np.where(moving, GAME_PIPE_SPEED * dt, 0.0)
+        passed = moving & ~self.scored & (self.pipe_x + m.PIPE_WIDTH < m.PLAYER_X)
+        self.scored |= passed
+        self.score += passed.sum(axis=1)
+        self.active &= ~(moving & (self.pipe_x + m.PIPE_WIDTH < 0))
+        
+        # Same box test as FlappyModel.collides(), over all pipe slots at once
+        top = self.y - m.PLAYER_HALF_HEIGHT
+        bottom = self.y + m.PLAYER_HALF_HEIGHT
+        overlap = (self.active
+                   & (self.pipe_x < m.PLAYER_X + m.PLAYER_HALF_WIDTH)
+                   & (self.pipe_x + m.PIPE_WIDTH > m.PLAYER_X - m.PLAYER_HALF_WIDTH))
+        hit = (overlap & ((top[:, None] < self.gap_top) | (bottom[:, None] > self.gap_bottom))).any(axis=1)
+        crashed = alive & ((self.y < m.CEILING) | (self.y > m.FLOOR) | hit)
+        self.alive = alive & ~crashed
+        
+        spawn = self.alive & (self.time >= self.next_pipe_at) & ~self.active.all(axis=1)
+        rows = np.nonzero(spawn)[0]
+        if len(rows):
+            slots = self.active[rows].argmin(axis=1)
+            centre = self.rng.integers(m.GAP_CENTER_RANGE[0], m.GAP_CENTER_RANGE[1] + 1, size=len(rows))
+            self.pipe_x[rows, slots] = m.WIDTH
+            self.gap_top[rows, slots] = centre - self.pipe_gap // 2
+            self.gap_bottom[rows, slots] = centre + self.pipe_gap // 2
+            self.active[rows, slots] = True
+            self.scored[rows, slots] = False
+            self.next_pipe_at[rows] = self.time[rows] + self.rng.uniform(*self.pipe_interval, size=len(rows))
+    
+    def run(self, max_seconds=60, step_ms=GAME_STEP_MS):
+        dt = step_ms / 1000
+        for _ in range(int(max_seconds / dt)):
+            if not self.alive.any():
+                break
+            self.step(dt, self.policy())
+        return self.score, self.time, ~self.alive
+
+
+def simulate_games(count, seed=0, max_seconds=60, pipe_gap=FlappyModel.PIPE_GAP,
+                   pipe_interval=GAME_PIPE_INTERVAL, noise=0.0, use_numpy=True):
+    """
+    Play count autopilot games and summarize how far they got
+    Returns: dict with score statistics, crash rate and, for each
+    achievement threshold, the fraction of games that reached it
+    """
+    batch = None
+    if use_numpy:
+        try:
+            batch = FlappyBatch(count, seed, pipe_gap, pipe_interval, noise=noise)
+        except ImportError:
+            batch = None  # No NumPy here; play the games one at a time
+    
+    if batch is not None:
+        scores, times, crashed = batch.run(max_seconds)
+        scores, times, crashed = scores.tolist(), times.tolist(), crashed.tolist()
+    else:
+        results = []
+        for game in range(count):
+            rng = random.Random(f"{seed}-{game}")
+            policy = lambda model, rng=rng: autopilot(model, noise=noise, rng=rng)
+            results.append(FlappySimulator(rng.random(), pipe_gap, pipe_interval, policy).run(max_seconds))
+        scores = [result['score'] for result in results]
+        times = [result['time'] for result in results]
+        crashed = [result['crashed'] for result in results]
+    
+    ordered = sorted(scores)
+    return {
+        'games': count,
+        'engine': 'numpy' if batch is not None else 'python',
+        'mean_score': sum(scores) / count if count else 0.0,
+        'median_score': ordered[count // 2] if count else 0,
+        'max_score': ordered[-1] if count else 0,
+        'crash_rate': sum(crashed) / count if count else 0.0,
+        'mean_time': sum(times) / count if count else 0.0,
+        'achievement_rates': {
+            score: sum(1 for s in scores if s >= score) / count if count else 0.0
+            for score in sorted(achievements)
+        }
+    }
+
+
+# ================= GAME REPLAYS =================
+def encode_varint(value):
+    """Unsigned LEB128: 7 bits per byte, high bit set on all but the last"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data, pos):
+    """Read a varint at pos; returns (value, next position)"""
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class GameReplay:
+    """
+    A game session as its seed, settings and flap inputs. The game runs on
+    a fixed timestep with a seeded RNG, so these are enough to replay it
+    exactly. Flaps are stored as the step they happened on, as varint
+    deltas, which is usually one byte per flap.
+    
+    File layout: b"EMRP", version byte, then little-endian seed (u64),
+    steps per second, pipe gap, pipe interval min/max in ms (u16 each) and
+    final score (u32), then varints: step count, flap count, flap deltas.
+    """
+    
+    MAGIC = b"EMRP"
+    VERSION = 1
+    HEADER = struct.Struct('<QHHHHI')
+    
+    def __init__(self, seed, pipe_gap=FlappyModel.PIPE_GAP,
+                 pipe_interval=GAME_PIPE_INTERVAL, step_hz=round(1000 / GAME_STEP_MS)):
+        self.seed = seed
+        self.pipe_gap = pipe_gap
+        self.pipe_interval = pipe_interval
+        self.step_hz = step_hz
+        self.dt = 1 / step_hz
+        self.flaps = []
+        self.steps = 0
+        self.score = 0
+    
+    def new_model(self):
+        return FlappyModel(random.Random(self.seed), self.pipe_gap, self.pipe_interval)
+    
+    def record_flap(self, step):
+        self.flaps.append(step)
+    
+    def finish(self, model):
+        self.steps = model.steps
+        self.score = model.score
+    
+    def to_bytes(self):
+        interval_ms = [round(seconds * 1000) for seconds in self.pipe_interval]
+        out = bytearray(self.MAGIC)
+        out.append(self.VERSION)
+        out += self.HEADER.pack(self.seed, self.step_hz, self.pipe_gap, *interval_ms, self.score)
+        out += encode_varint(self.steps)
+        out += encode_varint(len(self.flaps))
+        previous = 0
+        for step in self.flaps:
+            out += encode_varint(step - previous)
+            previous = step
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != cls.MAGIC:
+            raise ValueError("Not a replay file")
+        if data[4] != cls.VERSION:
+            raise ValueError(f"Unsupported replay version {data[4]}")
+        pos = 5 + cls.HEADER.size
+        seed, step_hz, pipe_gap, interval_min, interval_max, score = cls.HEADER.unpack(data[5:pos])
+        
+        replay = cls(seed, pipe_gap, (interval_min / 1000, interval_max / 1000), step_hz)
+        replay.score = score
+        replay.steps, pos = decode_varint(data, pos)
+        count, pos = decode_varint(data, pos)
+        step = 0
+        for _ in range(count):
+            delta, pos = decode_varint(data, pos)
+            step += delta
+            replay.flaps.append(step)
+        return replay
+    
+    def save(self, path):
+        atomic_write_bytes(path, self.to_bytes())
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+    
+    def play(self):
+        """Replay headless as fast as possible; returns the final model"""
+        player = ReplayPlayer(self)
+        while not player.finished:
+            player.step()
+        return player.model
+    
+    def verify(self):
+        """True if replaying reproduces the recorded score and length"""
+        model = self.play()
+        return model.score == self.score and model.steps == self.steps
+
+
+class ReplayPlayer:
+    """Steps a fresh model through a replay, applying flaps on their recorded steps"""
+    
+    def __init__(self, replay):
+        self.replay = replay
+        self.model = replay.new_model()
+        self.next_flap = 0
+    
+    @property
+    def finished(self):
+        return not self.model.alive or self.model.steps >= self.replay.steps
+    
+    def step(self):
+        """Run one step; returns the model's events"""
+        flaps = self.replay.flaps
+        while self.next_flap < len(flaps) and flaps[self.next_flap] <= self.model.steps:
+            self.model.flap()
+            self.next_flap += 1
+        return self.model.step(self.replay.dt)
+
+
+def save_session_replay(replay, replay_dir=REPLAY_DIR, keep=REPLAY_KEEP):
+    """Save a finished game to the replay folder, keeping the newest few"""
+    os.makedirs(replay_dir, exist_ok=True)
+    # Microseconds keep games that end in the same second from overwriting each other
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{replay.score}.replay"
+    path = os.path.join(replay_dir, name)
+    replay.save(path)
+    
+    saved = sorted(f for f in os.listdir(replay_dir) if f.endswith('.replay'))
+    for old in saved[:-keep]:
+        os.remove(os.path.join(replay_dir, old))
+    return path
+
+
+def verify_high_score():
+    """
+    Check highscore.txt against the replay of the game that set it
+    Returns: (verified, message); verified is None if there is no replay
+    """
+    try:
+        with open(HIGHSCORE_FILE, 'r') as f:
+            high_score = int(f.read())
+    except (OSError, ValueError):
+        return (None, "No high score yet")
+    if not os.path.exists(HIGHSCORE_REPLAY_FILE):
+        return (None, "No replay recorded for this high score")
+    
+    try:
+        replay = GameReplay.load(HIGHSCORE_REPLAY_FILE)
+    except (OSError, ValueError, struct.error) as e:
+        return (False, f"High score replay is unreadable: {str(e)}")
+    if replay.score != high_score:
+        return (False, f"Replay is for a score of {replay.score}, not {high_score}")
+    if not replay.verify():
+        return (False, "Replaying the game did not reproduce the score")
+    return (True, f"High score of {high_score} verified by replay")
+
+
+# ================= GAME SESSIONS =================
+class GameSession:
+    """One finished game: when it ended, score, length and pipes seen"""
+    
+    __slots__ = ('ended', 'score', 'duration_ms', 'frames', 'pipes')
+    
+    def __init__(self, ended, score, duration_ms, frames, pipes):
+        self.ended = ended
+        self.score = score
+        self.duration_ms = duration_ms
+        self.frames = frames
+        self.pipes = pipes
+
+
+class Leaderboard:
+    """
+    Running statistics over game sessions. Scores are small integers, so
+    an exact count per score gives the median, p90 and histogram without
+    keeping or sorting every session; the top games are kept in a short
+    sorted list. Adding a session is O(log n) at worst.
+    """
+    
+    # Lower edges of the histogram buckets; the last one is open-ended
+    BUCKETS = (0, 1, 5, 10, 15, 20, 30, 50)
+    
+    def __init__(self, size=LEADERBOARD_SIZE):
+        self.size = size
+        self.top = []  # (score, ended), best last
+        self.score_counts = {}
+        self.sorted_scores = []
+        self.games = 0
+        self.total_score = 0
+        self.total_ms = 0
+    
+    def add(self, session):
+        self.games += 1
+        self.total_score += session.score
+        self.total_ms += session.duration_ms
+        
+        if session.score not in self.score_counts:
+            self.score_counts[session.score] = 0
+            bisect.insort(self.sorted_scores, session.score)
+        self.score_counts[session.score] += 1
+        
+        if len(self.top) < self.size or session.score > self.top[0][0]:
+            bisect.insort(self.top, (session.score, session.ended))
+            if len(self.top) > self.size:
+                self.top.pop(0)
+    
+    def percentile(self, fraction):
+        """Nearest-rank percentile of all scores"""
+        if not self.games:
+            return 0
+        rank = max(1, math.ceil(self.games * fraction))
+        seen = 0
+        for score in self.sorted_scores:
+            seen += self.score_counts[score]
+            if seen >= rank:
+                return score
+        return self.sorted_scores[-1]
+    
+    def histogram(self):
+        """Returns: list of (label, games) for each score bucket"""
+        counts = [0] * len(self.BUCKETS)
+        for score, games in self.score_counts.items():
+            counts[bisect.bisect_right(self.BUCKETS, score) - 1] += games
+        labels = []
+        for i, low in enumerate(self.BUCKETS):
+            if i + 1 == len(self.BUCKETS):
+                labels.append(f"{low}+")
+            elif self.BUCKETS[i + 1] - low == 1:
+                labels.append(f"{low}")
+            else:
+                labels.append(f"{low}-{self.BUCKETS[i + 1] - 1}")
+        return list(zip(labels, counts))
+    
+    def best(self):
+        """Top scores, best first, as (score, ended) pairs"""
+        return self.top[::-1]
+    
+    def summary(self):
+        return {
+            'games': self.games,
+            'mean_score': self.total_score / self.games if self.games else 0.0,
+            'median_score': self.percentile(0.5),
+            'p90_score': self.percentile(0.9),
+            'best': [score for score, ended in self.best()],
+            'hours_played': self.total_ms / 3600000,
+            'histogram': self.histogram()
+        }
+
+
+class GameSessionLog:
+    """
+    Append-only log of finished games with a leaderboard over all of them.
+    
+    File layout: b"EMGS", version byte, then one fixed-size little-endian
+    record per game: end time (unix seconds, u32), score (u16), duration
+    in ms (u32), frames drawn (u32) and pipes seen (u16), 16 bytes in all.
+    The log is read once, on first use; new sessions are appended by the
+    write coalescer, and a torn last record is ignored. A file with some
+    other header is moved aside to .corrupt and a fresh log started.
+    """
+    
+    MAGIC = b"EMGS"
+    VERSION = 1
+    HEADER = MAGIC + bytes([VERSION])
+    RECORD = struct.Struct('<IHIIH')
+    
+    def __init__(self, path=GAME_SESSIONS_FILE):
+        self.path = path
+        self.leaderboard = None
+        self.pending = []
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """Read the log into the leaderboard, once"""
+        if self.leaderboard is not None:
+            return self.leaderboard
+        leaderboard = Leaderboard()
+        started = time.perf_counter()
+        try:
+            with self.lock:
+                self.set_aside_if_foreign()
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as f:
+                    data = f.read()
+                body = memoryview(data)[len(self.HEADER):]
+                usable = len(body) - len(body) % self.RECORD.size
+                for record in self.RECORD.iter_unpack(body[:usable]):
+                    leaderboard.add(GameSession(*record))
+        except Exception as e:
+            log_error(f"Error loading game sessions: {str(e)}", 'games', 'sessions')
+        self.leaderboard = leaderboard
+        log_event(logging.INFO, "Game sessions loaded", 'games', 'sessions',
+                  (time.perf_counter() - started) * 1000, games=leaderboard.games)
+        return leaderboard
+    
+    def record(self, score, duration_ms, frames, pipes, ended=None):
+        """Add a finished game; it is written with the next batch"""
+        session = GameSession(
+            int(ended if ended is not None else time.time()),
+            min(score, 0xFFFF),
+            min(int(duration_ms), 0xFFFFFFFF),
+            min(frames, 0xFFFFFFFF),
+            min(pipes, 0xFFFF)
+        )
+        self.load().add(session)
+        with self.lock:
+            self.pending.append(self.RECORD.pack(
+                session.ended, session.score, session.duration_ms, session.frames, session.pipes
+            ))
+        write_coalescer.mark_dirty(self)
+        return session
+    
+    def set_aside_if_foreign(self):
+        """
+        Move the file out of the way if it doesn't start with our header,
+        so records are never appended to a log that can't be read back;
+        caller holds the lock
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                start = f.read(len(self.HEADER))
+        except FileNotFoundError:
+            return
+        if start == self.HEADER[:len(start)]:
+            return  # Ours, possibly with a torn header that the next write redoes
+        corrupt_path = self.path + ".corrupt"
+        os.replace(self.path, corrupt_path)
+        log_error(f"Game session log was unreadable, moved it to {corrupt_path}", 'games', 'sessions')
+    
+    def write_to_disk(self, fsync=False):
+        """Append queued records in a single write (called by the write coalescer)"""
+        try:
+            with self.lock:
+                if not self.pending:
+                    return
+                self.set_aside_if_foreign()
+                with open(self.path, 'ab') as f:
+                    # Cut off a torn record first so new ones stay aligned
+                    size = f.tell()
+                    header = len(self.HEADER)
+                    if size < header:
+                        f.truncate(0)
+                        f.write(self.HEADER)
+                    elif (size - header) % self.RECORD.size:
+                        f.truncate(size - (size - header) % self.RECORD.size)
+                    f.write(b"".join(self.pending))
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                self.pending = []
+        except Exception as e:
+            log_error(f"Error saving game sessions: {str(e)}", 'games', 'sessions')
 
 
+game_sessions = GameSessionLog()
 
 
 # ================= DATA STRUCTURES =================
@@ -696,97 +3376,114 @@ achievements = {
 
 
 # ================= PASSWORD PROTECTION =================
-def check_password():
-    """Check if the entered password is correct"""
-    entered = password_entry.get()
-    if entered == "112323":  
-        login_window.destroy()
-        open_main_app()
-    else:
-        error_label.config(text=" Wrong password!    Try again, baby :  )")
-        password_entry.delete(0, tk.END)
-
-def on_enter_key(event):
-    """Allow Enter key to submit password"""
-    check_password()
-
-# Create login window
-login_window = tk.  Tk()
-login_window.title("For Bianca Nichole B.  Oxcello ")
-login_window.geometry("450x350")
-login_window.resizable(False, False)
-login_window.configure(bg="#fff0f5")
-
-# Center the window
-login_window.eval('tk::PlaceWindow .   center')
-
-# Login content
-tk.Label(
-    login_window,
-    text="💖",
-    font=("Arial", 48),
-    bg="#fff0f5"
-).pack(pady=20)
-
-tk.Label(
-    login_window,
-    text="Enter Password",
-    font=("Helvetica", 16, "bold"),
-    bg="#fff0f5",
-    fg="#b30059"
-).pack(pady=5)
-
-tk.Label(
-    login_window,
-    text="(Hint: Our special date! )",
-    font=("Helvetica", 9, "italic"),
-    bg="#fff0f5",
-    fg="#800040"
-).pack(pady=2)
-
-# Password entry
-password_entry = tk.Entry(
-    login_window,
-    font=("Helvetica", 20),
-    justify="center",
-    width=12,
-    show="•"  # Hides the password with dots
-)
-password_entry.pack(pady=15)
-password_entry.focus()
-
-# Error label
-error_label = tk.  Label(
-    login_window,
-    text="",
-    font=("Helvetica", 10),
-    bg="#fff0f5",
-    fg="#cc0000"
-)
-error_label.pack(pady=5)
-
-# Submit button - BIGGER AND EASIER TO CLICK
-submit_button = tk.Button(
-    login_window,
-    text=" Enter ",
-    font=("Helvetica", 14, "bold"),
-    bg="#ff66a3",
-    fg="white",
-    width=20,
-    height=2,
-    cursor="hand2",
-    activebackground="#ff4da6",
-    relief="raised",
-    borderwidth=3,
-    command=check_password
-)
-submit_button.pack(pady=15)
-
-# Bind Enter key to submit
-password_entry.bind("<Return>", on_enter_key)
+def create_login_window():
+    """Build the password window; the main app opens once it is unlocked"""
+    def check_password():
+        """Check if the entered password is correct"""
+        entered = password_entry.get()
+        if entered == "112323":  
+            login_window.destroy()
+            open_main_app()
+        else:
+            error_label.config(text=" Wrong password!    Try again, baby :  )")
+            password_entry.delete(0, tk.END)
+    
+    def on_enter_key(event):
+        """Allow Enter key to submit password"""
+        check_password()
+    
+    # Create login window
+    login_window = tk.  Tk()
+    login_window.title("For Bianca Nichole B.  Oxcello ")
+    login_window.geometry("450x350")
+    login_window.resizable(False, False)
+    login_window.configure(bg="#fff0f5")
+    
+    # Center the window
+    login_window.eval('tk::PlaceWindow .   center')
+    
+    # Login content
+    tk.Label(
+        login_window,
+        text="💖",
+        font=("Arial", 48),
+        bg="#fff0f5"
+    ).pack(pady=20)
+    
+    tk.Label(
+        login_window,
+        text="Enter Password",
+        font=("Helvetica", 16, "bold"),
+        bg="#fff0f5",
+        fg="#b30059"
+    ).pack(pady=5)
+    
+    tk.Label(
+        login_window,
+        text="(Hint: Our special date! )",
+        font=("Helvetica", 9, "italic"),
+        bg="#fff0f5",
+        fg="#800040"
+    ).pack(pady=2)
+    
+    # Password entry
+    password_entry = tk.Entry(
+        login_window,
+        font=("Helvetica", 20),
+        justify="center",
+        width=12,
+        show="•"  # Hides the password with dots
+    )
+    password_entry.pack(pady=15)
+    password_entry.focus()
+    
+    # Error label
+    error_label = tk.  Label(
+        login_window,
+        text="",
+        font=("Helvetica", 10),
+        bg="#fff0f5",
+        fg="#cc0000"
+    )
+    error_label.pack(pady=5)
+    
+    # Submit button - BIGGER AND EASIER TO CLICK
+    submit_button = tk.Button(
+        login_window,
+        text=" Enter ",
+        font=("Helvetica", 14, "bold"),
+        bg="#ff66a3",
+        fg="white",
+        width=20,
+        height=2,
+        cursor="hand2",
+        activebackground="#ff4da6",
+        relief="raised",
+        borderwidth=3,
+        command=check_password
+    )
+    submit_button.pack(pady=15)
+    
+    # Bind Enter key to submit
+    password_entry.bind("<Return>", on_enter_key)
+    
+    return login_window
 
 
 # ================= MAIN APP FUNCTION =================
+def start_metrics_export(settings_manager):
+    """Start the metrics endpoint and snapshot file if settings ask for them"""
+    port = settings_manager.get('metrics_port', METRICS_PORT)
+    interval = settings_manager.get('metrics_snapshot_interval', METRICS_SNAPSHOT_INTERVAL)
+    try:
+        if port:
+            metrics.start_server(port)
+        if interval:
+            metrics.start_snapshots(interval)
+    except Exception as e:
+        log_error(f"Error starting metrics export: {str(e)}", 'metrics', 'start')
+
+
 def open_main_app():
     """Main application with modern tab-based UI"""
     print("Opening main app with tabs...")
@@ -795,8 +3492,30 @@ def open_main_app():
     days_together = (today - START_DATE).days
     
     # Initialize managers
-    journal_manager = JournalManager()
     settings_manager = SettingsManager()
+    try:
+        write_coalescer.set_durability(settings_manager.get('write_durability', 'batch'))
+    except ValueError:
+        pass  # Unknown mode in settings.json, keep the default
+    try:
+        set_log_level(settings_manager.get('log_level', 'WARNING'))
+    except ValueError:
+        pass
+    callback_tracer.enabled = settings_manager.get('trace_callbacks', False)
+    start_metrics_export(settings_manager)
+    
+    # Only reads email_config.json, so the Settings tab can have it without
+    # loading the journal
+    email_notifier = EmailNotifier()
+    
+    # The journal is loaded when a tab first needs it, not before the window shows
+    journal_managers = []
+    
+    def get_journal_manager():
+        if not journal_managers:
+            journal_managers.append(JournalManager(
+                settings_manager.get('journal_backend', 'log'), email_notifier=email_notifier))
+        return journal_managers[0]
     
     # ================= MAIN WINDOW =================
     window = tk.Tk()
@@ -805,6 +3524,14 @@ def open_main_app():
     window.resizable(True, True)
     window.configure(bg=COLORS['bg_main'])
     
+    # Log the Tk thread's stack whenever the window stops responding
+    stall_watchdog = None
+    stall_threshold_ms = settings_manager.get('stall_threshold_ms', STALL_THRESHOLD_MS)
+    if stall_threshold_ms:
+        stall_watchdog = StallWatchdog(window, stall_threshold_ms)
+        stall_watchdog.start()
+        atexit.register(stall_watchdog.log_report)
+    
     # Create notebook for tabs
     notebook = ttk.Notebook(window)
     notebook.pack(fill='both', expand=True, padx=10, pady=10)
@@ -819,45 +3546,470 @@ def open_main_app():
         foreground=[('selected', COLORS['white'])])
     
     # ================= CREATE TABS =================
+    # Each tab's contents are built the first time it is shown
+    tabs = LazyNotebook(notebook)
+    
     # HOME TAB
-    home_tab = tk.Frame(notebook, bg=COLORS['bg_main'])
-    notebook.add(home_tab, text='🏠 Home')
+    tabs.add('🏠 Home', lambda tab: create_home_tab(
+        tab, days_together, daily_messages, morning_messages,
+        night_messages, mood_messages, monthly_23rd_messages))
     
     # TIMELINE TAB
-    timeline_tab = tk.Frame(notebook, bg=COLORS['bg_main'])
-    notebook.add(timeline_tab, text='📅 Timeline')
+    tabs.add('📅 Timeline', lambda tab: create_timeline_tab(tab, days_together))
     
     # GAMES TAB
-    games_tab = tk.Frame(notebook, bg=COLORS['bg_main'])
-    notebook.add(games_tab, text='🎮 Games')
+    tabs.add('🎮 Games', lambda tab: create_games_tab(
+        tab, window, settings_manager.get('record_replays', True)))
     
     # JOURNAL TAB (NEW)
-    journal_tab = tk.Frame(notebook, bg=COLORS['bg_main'])
-    notebook.add(journal_tab, text='💭 Journal')
+    tabs.add('💭 Journal', lambda tab: create_journal_tab(
+        tab, get_journal_manager(), days_together, mood_messages))
     
     # SETTINGS TAB
-    settings_tab = tk.Frame(notebook, bg=COLORS['bg_main'])
-    notebook.add(settings_tab, text='⚙️ Settings')
+    tabs.add('⚙️ Settings', lambda tab: create_settings_tab(
+        tab, settings_manager, email_notifier, stall_watchdog))
     
     print("Tabs created successfully")
     
-    # ================= HOME TAB CONTENT =================
-    create_home_tab(home_tab, days_together, daily_messages, morning_messages, 
-                    night_messages, mood_messages, monthly_23rd_messages)
+    # Show the first tab now, then fill in the rest while the app is idle
+    tabs.build_selected()
+    if settings_manager.get('prebuild_tabs', True):
+        tabs.prebuild()
+    
+    try:
+        window.mainloop()
+    finally:
+        # No heartbeats once the window is gone; teardown isn't a stall
+        if stall_watchdog is not None:
+            stall_watchdog.stop()
+
+
+# ================= UI WIDGETS =================
+class VirtualEntryList:
+    """
+    Scrollable list of journal entries that only builds widgets for the rows
+    in view. A small pool of row frames sits on a canvas; scrolling moves the
+    rows and refills them with other entries instead of creating new ones.
+    Entries arrive a page at a time: when the view gets near the last loaded
+    entry, on_need_more(next_cursor) is called to fetch the next page.
+    """
+    
+    ROW_HEIGHT = 95
+    ROW_GAP = 5
+    # Rows left below the view when the next page is requested
+    PREFETCH_ROWS = 10
+    
+    def __init__(self, parent, height=200, on_need_more=None):
+        self.canvas = tk.Canvas(parent, bg=COLORS['bg_main'], highlightthickness=0, height=height)
+        self.scrollbar = tk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll, yscrollincrement=self.ROW_HEIGHT // 3)
+        
+        self.entries = []
+        self.next_cursor = None
+        self.on_need_more = on_need_more
+        self.loading_more = False
+        self.rows = []
+        self.row_width = 1
+        self.empty_text = self.canvas.create_text(
+            20, 20,
+            text="No entries found. Start writing! 💕",
+            font=FONTS['body'],
+            fill=COLORS['text_light'],
+            anchor='nw',
+            state='hidden'
+        )
+        
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.bind_mousewheel(self.canvas)
+    
+    def pack(self):
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+    
+    def bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+    
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        steps = int(-event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.canvas.yview_scroll(steps, "units")
+    
+    def set_entries(self, entries, next_cursor=None):
+        """
+        Show the first page of a new list of entries, scrolled back to the top
+        next_cursor is passed to on_need_more for the following page; None
+        means there are no more entries
+        """
+        self.entries = list(entries)
+        self.next_cursor = next_cursor
+        self.loading_more = False
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, len(entries) * self.ROW_HEIGHT))
+        self.canvas.itemconfigure(self.empty_text, state='normal' if not entries else 'hidden')
+        for row in self.rows:
+            row['entry'] = None
+        self.canvas.yview_moveto(0)
+        self.render()
+    
+    def append_entries(self, entries, next_cursor=None):
+        """Add the next page below the loaded entries, keeping the scroll position"""
+        self.entries.extend(entries)
+        self.next_cursor = next_cursor
+        self.loading_more = False
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, len(self.entries) * self.ROW_HEIGHT))
+        self.render()
+    
+    def refresh_entry(self, entry_id, fields):
+        """Apply changed fields to a listed entry and redraw it if in view"""
+        for entry in self.entries:
+            if entry.get('id') == entry_id:
+                entry.update(fields)
+                break
+        for row in self.rows:
+            if row['entry'] is not None and row['entry'].get('id') == entry_id:
+                self.fill_row(row, row['entry'])
+    
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.render()
+    
+    def on_resize(self, event):
+        self.row_width = max(event.width - 10, 1)
+        for row in self.rows:
+            self.canvas.itemconfigure(row['window'], width=self.row_width)
+            row['preview'].config(wraplength=max(self.row_width - 30, 100))
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, len(self.entries) * self.ROW_HEIGHT))
+        self.render()
+    
+    def make_row(self):
+        """Create one reusable row widget for the pool"""
+        frame = tk.Frame(self.canvas, bg=COLORS['white'], relief='raised', borderwidth=1)
+        frame.pack_propagate(False)
+        
+        header = tk.Label(frame, font=FONTS['button'], bg=COLORS['white'], fg=COLORS['accent'])
+        header.pack(anchor='w', padx=10, pady=5)
+        
+        preview = tk.Label(
+            frame,
+            font=FONTS['small'],
+            bg=COLORS['white'],
+            fg=COLORS['text_dark'],
+            wraplength=max(self.row_width - 30, 100),
+            justify='left'
+        )
+        preview.pack(anchor='w', padx=10)
+        
+        status = tk.Label(frame, font=FONTS['small'], bg=COLORS['white'], fg=COLORS['success'])
+        status.pack(anchor='w', padx=10, pady=2)
+        
+        for widget in (frame, header, preview, status):
+            self.bind_mousewheel(widget)
+        
+        window = self.canvas.create_window(
+            5, -self.ROW_HEIGHT,
+            window=frame,
+            anchor='nw',
+            width=self.row_width,
+            height=self.ROW_HEIGHT - self.ROW_GAP
+        )
+        return {'frame': frame, 'header': header, 'preview': preview,
+                'status': status, 'window': window, 'entry': None, 'index': None}
+    
+    def fill_row(self, row, entry):
+        text = entry.get('entry', '')
+        row['header'].config(text=f"{entry.get('mood', 'Unknown')} - {entry.get('date', 'Unknown')}")
+        row['preview'].config(text=text[:100] + ('...' if len(text) > 100 else ''))
+        row['status'].config(text="📧 Email sent" if entry.get('email_sent') else "")
+        row['entry'] = entry
+    
+    @callback_tracer.traced('journal.render_rows')
+    def render(self):
+        """Place pooled rows over the entries in the visible scroll window"""
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), int(self.canvas.cget('height')))
+        first = max(int(top // self.ROW_HEIGHT), 0)
+        visible = height // self.ROW_HEIGHT + 2
+        
+        while len(self.rows) < visible:
+            self.rows.append(self.make_row())
+        
+        for slot, row in enumerate(self.rows):
+            index = first + slot
+            if index < len(self.entries):
+                entry = self.entries[index]
+                if row['entry'] is not entry:
+                    self.fill_row(row, entry)
+                if row['index'] != index:
+                    self.canvas.coords(row['window'], 5, index * self.ROW_HEIGHT)
+                    row['index'] = index
+            elif row['index'] is not None:
+                # Park unused rows above the scroll region
+                self.canvas.coords(row['window'], 5, -self.ROW_HEIGHT)
+                row['entry'] = None
+                row['index'] = None
+        
+        if (self.next_cursor is not None and not self.loading_more and self.on_need_more
+                and first + visible + self.PREFETCH_ROWS >= len(self.entries)):
+            self.loading_more = True
+            self.on_need_more(self.next_cursor)
+
+
+class UiCallbackQueue:
+    """Lets background threads hand callbacks to the Tk thread"""
+    
+    POLL_MS = 100
+    
+    def __init__(self, widget):
+        self.widget = widget
+        self.callbacks = queue.Queue()
+        self.widget.after(self.POLL_MS, self.drain)
+    
+    def post(self, callback, *args):
+        """Schedule callback(*args) on the Tk thread; safe from any thread"""
+        self.callbacks.put((callback, args))
     
-    # ================= TIMELINE TAB CONTENT =================
-    create_timeline_tab(timeline_tab, days_together)
+    @callback_tracer.traced('ui.callback_queue')
+    def drain(self):
+        try:
+            self.widget.after(self.POLL_MS, self.drain)
+        except tk.TclError:
+            return  # Widget destroyed, stop polling
+        while True:
+            try:
+                callback, args = self.callbacks.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+
+
+class LazyNotebook:
+    """
+    Notebook whose tab contents are built on first view. Each tab is
+    registered with a builder that fills its frame; the builder runs the
+    first time the tab is selected, or earlier from prebuild().
+    """
+    
+    PREBUILD_DELAY_MS = 300
+    
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self.builders = {}
+        self.notebook.bind('<<NotebookTabChanged>>', self.build_selected)
+    
+    def add(self, text, builder):
+        """Add an empty tab; builder(frame) fills it in later"""
+        tab = tk.Frame(self.notebook, bg=COLORS['bg_main'])
+        self.builders[str(tab)] = (tab, text, builder)
+        self.notebook.add(tab, text=text)
+        return tab
+    
+    @callback_tracer.traced('ui.build_tab')
+    def build(self, name):
+        """Build the named tab if it has not been built yet"""
+        if name not in self.builders:
+            return
+        tab, text, builder = self.builders.pop(name)
+        started = time.perf_counter()
+        builder(tab)
+        log_event(logging.INFO, "Tab built", 'ui', 'build_tab',
+                  (time.perf_counter() - started) * 1000, tab=text.split()[-1])
+    
+    def build_selected(self, event=None):
+        self.build(self.notebook.select())
+    
+    def prebuild(self):
+        """Build the remaining tabs one at a time while the app is idle"""
+        self.notebook.after(self.PREBUILD_DELAY_MS, self.notebook.after_idle, self.prebuild_next)
+    
+    def prebuild_next(self):
+        if not self.builders:
+            return
+        self.build(next(iter(self.builders)))
+        if self.builders:
+            self.prebuild()
+
+
+class SearchPipeline:
+    """
+    Runs history queries on a worker thread so typing never waits on them.
+    Requests are debounced, a newer request makes any older one stale, and
+    only the result of the newest request is handed back to the Tk thread,
+    which picks it up with after() polling. Once that result is shown,
+    fetch_more() runs follow-up queries (such as the next page) under the
+    same request, so they are dropped too if a newer request comes in.
+    """
+    
+    DEBOUNCE_MS = 200
+    POLL_MS = 15
+    
+    def __init__(self, widget, query_func, on_result):
+        self.widget = widget
+        self.query_func = query_func
+        self.on_result = on_result
+        self.generation = 0
+        self.debounce_job = None
+        self.poll_job = None
+        self.shown_generation = None
+        self.request = None
+        self.result = None
+        self.condition = threading.Condition()
+        threading.Thread(target=self.worker, name="history-search", daemon=True).start()
+    
+    def submit(self, *args, delay=None):
+        """Queue a query; any query submitted earlier is abandoned"""
+        self.generation += 1
+        if self.debounce_job is not None:
+            self.widget.after_cancel(self.debounce_job)
+        self.debounce_job = self.widget.after(
+            self.DEBOUNCE_MS if delay is None else delay,
+            self.dispatch, self.generation, args
+        )
+    
+    def fetch_more(self, *args):
+        """Queue a follow-up query to the request whose result is on screen"""
+        if self.shown_generation == self.generation:
+            self.dispatch(self.generation, args)
+    
+    def is_stale(self, generation):
+        return generation != self.generation
+    
+    def dispatch(self, generation, args):
+        self.debounce_job = None
+        if self.is_stale(generation):
+            return
+        with self.condition:
+            self.request = (generation, args)
+            self.condition.notify()
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_MS, self.poll)
+    
+    def worker(self):
+        while True:
+            with self.condition:
+                while self.request is None:
+                    self.condition.wait()
+                generation, args = self.request
+                self.request = None
+            
+            if self.is_stale(generation):
+                continue
+            result = self.query_func(*args, cancelled=lambda: self.is_stale(generation))
+            with self.condition:
+                self.result = (generation, result)
+    
+    @callback_tracer.traced('journal.search_poll')
+    def poll(self):
+        self.poll_job = None
+        with self.condition:
+            finished, self.result = self.result, None
+        
+        if finished is not None and not self.is_stale(finished[0]):
+            self.shown_generation = finished[0]
+            self.on_result(finished[1])
+            return
+        # Keep polling while the newest query is still queued or running
+        self.poll_job = self.widget.after(self.POLL_MS, self.poll)
+
+
+def heart_sprite(size, fill="#ff4d94", outline="#b30059"):
+    """
+    A heart drawn pixel by pixel into a PhotoImage, made once per size and
+    colour and cached. Pixels outside the heart are left transparent.
+    """
+    key = ('heart', size, fill, outline)
+    if key in SPRITE_CACHE:
+        return SPRITE_CACHE[key]
     
-    # ================= GAMES TAB CONTENT =================
-    create_games_tab(games_tab, window)
+    def inside(px, py):
+        # Classic heart curve (x^2 + y^2 - 1)^3 - x^2 y^3 <= 0, y pointing up
+        x = (px + 0.5) / size * 2.6 - 1.3
+        y = 1.25 - (py + 0.5) / size * 2.5
+        return (x * x + y * y - 1) ** 3 - x * x * y ** 3 <= 0
     
-    # ================= JOURNAL TAB CONTENT =================
-    create_journal_tab(journal_tab, journal_manager, days_together, mood_messages)
+    mask = [[inside(px, py) for px in range(size)] for py in range(size)]
     
-    # ================= SETTINGS TAB CONTENT =================
-    create_settings_tab(settings_tab, settings_manager, journal_manager.email_notifier)
+    def colour(px, py):
+        if not mask[py][px]:
+            return None
+        edge = any(
+            not (0 <= nx < size and 0 <= ny < size and mask[ny][nx])
+            for nx, ny in ((px - 1, py), (px + 1, py), (px, py - 1), (px, py + 1))
+        )
+        return outline if edge else fill
+    
+    image = tk.PhotoImage(width=size, height=size)
+    for py in range(size):
+        # Write each row as runs of one colour
+        px = 0
+        while px < size:
+            current = colour(px, py)
+            end = px + 1
+            while end < size and colour(end, py) == current:
+                end += 1
+            if current is not None:
+                image.put(current, to=(px, py, end, py + 1))
+            px = end
+    
+    SPRITE_CACHE[key] = image
+    return image
+
+
+SPRITE_CACHE = {}
+
+
+class FlappyRenderer:
+    """
+    Draws a FlappyModel on a canvas without per-frame allocation. Pipe
+    rectangles come from a fixed pool: spawning shows a free pair, removal
+    hides it again, and each frame only moves items with coords(). The
+    player is a cached heart sprite instead of a re-laid-out emoji.
+    """
     
-    window.mainloop()
+    PIPE_POOL_SIZE = 4
+    PIPE_STYLE = {'fill': "#ff80bf", 'outline': "#ff4da6", 'width': 2}
+    PLAYER_SPRITE_SIZE = 32
+    
+    def __init__(self, canvas, model):
+        self.canvas = canvas
+        self.model = model
+        self.free_pipes = [self.make_pipe_items() for _ in range(self.PIPE_POOL_SIZE)]
+        self.pipe_items = {}
+        self.player = canvas.create_image(
+            model.PLAYER_X, model.y, image=heart_sprite(self.PLAYER_SPRITE_SIZE)
+        )
+    
+    def make_pipe_items(self):
+        return tuple(
+            self.canvas.create_rectangle(0, 0, 0, 0, state='hidden', **self.PIPE_STYLE)
+            for _ in range(2)
+        )
+    
+    def add_pipe(self, pipe):
+        # The pool only grows if more pipes are on screen than ever before
+        items = self.free_pipes.pop() if self.free_pipes else self.make_pipe_items()
+        self.pipe_items[pipe] = items
+        self.place_pipe(pipe, items)
+        for item in items:
+            self.canvas.itemconfig(item, state='normal')
+    
+    def remove_pipe(self, pipe):
+        items = self.pipe_items.pop(pipe)
+        for item in items:
+            self.canvas.itemconfig(item, state='hidden')
+        self.free_pipes.append(items)
+    
+    def place_pipe(self, pipe, items):
+        top, bottom = items
+        right = pipe.x + self.model.PIPE_WIDTH
+        self.canvas.coords(top, pipe.x, 0, right, pipe.gap_top)
+        self.canvas.coords(bottom, pipe.x, pipe.gap_bottom, right, self.model.HEIGHT)
+    
+    def draw(self):
+        """Write the model's positions to the canvas; never reads it back"""
+        self.canvas.coords(self.player, self.model.PLAYER_X, self.model.y)
+        for pipe, items in self.pipe_items.items():
+            self.place_pipe(pipe, items)
 
 
 # ================= TAB CREATION FUNCTIONS =================
@@ -1159,7 +4311,24 @@ def create_timeline_tab(parent, days_together):
         ).pack(pady=5)
 
 
-def create_games_tab(parent, main_window):
+def leaderboard_text(summary, bar_width=12):
+    """Leaderboard summary -> a few lines of text with a bar histogram"""
+    if not summary['games']:
+        return "No games yet\nPlay one to start\nyour leaderboard!"
+    lines = [
+        f"Games {summary['games']}",
+        f"Median {summary['median_score']}  p90 {summary['p90_score']}",
+        "Top " + " ".join(str(score) for score in summary['best']),
+        ""
+    ]
+    most = max(games for label, games in summary['histogram'])
+    for label, games in summary['histogram']:
+        bar = "█" * math.ceil(bar_width * games / most) if games else ""
+        lines.append(f"{label:>5} {bar} {games}" if games else f"{label:>5}")
+    return "\n".join(lines)
+
+
+def create_games_tab(parent, main_window, record_replays=True):
     """Create games tab with Flappy Bird game and achievements"""
     # Container
     container = tk.Frame(parent, bg=COLORS['bg_main'])
@@ -1194,8 +4363,12 @@ def create_games_tab(parent, main_window):
     else:
         high_score = 0
     
+    # High score with the leaderboard of every game played beside it
+    scores_row = tk.Frame(container, bg=COLORS['bg_main'])
+    scores_row.pack(pady=10)
+    
     high_score_label = tk.Label(
-        container,
+        scores_row,
         text=f"🏆 High Score: {high_score} 🏆",
         font=FONTS['heading'],
         bg=COLORS['white'],
@@ -1203,7 +4376,49 @@ def create_games_tab(parent, main_window):
         padx=20,
         pady=10
     )
-    high_score_label.pack(pady=10)
+    high_score_label.pack(side='left', padx=(0, 10))
+    
+    leaderboard_label = tk.Label(
+        scores_row,
+        text="",
+        font=("Courier", 9),
+        bg=COLORS['white'],
+        fg=COLORS['text_dark'],
+        justify='left',
+        padx=10,
+        pady=5
+    )
+    leaderboard_label.pack(side='left')
+    
+    def refresh_leaderboard():
+        leaderboard_label.config(text=leaderboard_text(game_sessions.load().summary()))
+    
+    refresh_leaderboard()
+    
+    replay_status = tk.Label(
+        container,
+        text="",
+        font=FONTS['small'],
+        bg=COLORS['bg_main'],
+        fg=COLORS['text_light']
+    )
+    replay_status.pack()
+    
+    # Replaying the best game takes a moment, so check it off the Tk thread
+    ui_queue = UiCallbackQueue(container)
+    
+    def show_verification(verified, message):
+        if verified is None:
+            replay_status.config(text="")
+            return
+        replay_status.config(text=("✔ " if verified else "⚠ ") + message)
+        if not verified:
+            log_event(logging.WARNING, message, 'games', 'verify_high_score')
+    
+    def check_high_score():
+        ui_queue.post(show_verification, *verify_high_score())
+    
+    threading.Thread(target=check_high_score, name="verify-high-score", daemon=True).start()
     
     # Game button
     def open_game():
@@ -1216,29 +4431,15 @@ def create_games_tab(parent, main_window):
         game_canvas = tk.Canvas(game, width=400, height=450, bg="#e6f7ff")
         game_canvas.pack()
         
-        score = 0
-        velocity = 0
-        pipes = []
+        # The seed plus the flap steps reproduce the whole game
+        seed = random.getrandbits(64)
+        model = FlappyModel(random.Random(seed))
+        replay = GameReplay(seed) if record_replays else None
         game_running = True
-        shown_achievements = set()
-        
-        # Load unlocked achievements
-        if os.path.exists(ACHIEVEMENTS_FILE):
-            try:
-                with open(ACHIEVEMENTS_FILE, 'r') as f:
-                    unlocked_achievements = json.load(f)
-            except:
-                unlocked_achievements = []
-        else:
-            unlocked_achievements = []
-        
-        def save_achievement(score):
-            if score not in unlocked_achievements and score in achievements:
-                unlocked_achievements.append(score)
-                with open(ACHIEVEMENTS_FILE, 'w') as f:
-                    json.dump(unlocked_achievements, f)
+        pipes_seen = 0
+        clock = FixedTimestepClock()
         
-        player = game_canvas.create_text(80, 225, text="💗", font=("Arial", 28))
+        renderer = FlappyRenderer(game_canvas, model)
         
         score_text = game_canvas.create_text(
             200, 30,
@@ -1247,13 +4448,7 @@ def create_games_tab(parent, main_window):
         )
         
         def show_achievement_popup(score):
-            if (score in achievements and 
-                score not in unlocked_achievements and
-                score not in shown_achievements):
-                
-                shown_achievements.add(score)
-                save_achievement(score)
-                
+            if achievement_manager.unlock(score):
                 ach = achievements[score]
                 
                 popup = tk.Toplevel(game)
@@ -1307,93 +4502,81 @@ def create_games_tab(parent, main_window):
                 ).pack(pady=15)
         
         def flap(event=None):
-            nonlocal velocity
             if game_running:
-                velocity = -5
-        
-        def create_pipe():
-            gap_y = random.randint(130, 300)
-            gap_size = 200
-            top = game_canvas.create_rectangle(400, 0, 450, gap_y - gap_size//2, 
-                                              fill="#ff80bf", outline="#ff4da6", width=2)
-            bottom = game_canvas.create_rectangle(400, gap_y + gap_size//2, 450, 450, 
-                                                  fill="#ff80bf", outline="#ff4da6", width=2)
-            pipes.append((top, bottom, False))
-        
-        def hit_pipe():
-            coords = game_canvas.bbox(player)
-            if not coords:
-                return False
-            px1, py1, px2, py2 = coords
-            
-            for top, bottom, _ in pipes:
-                top_coords = game_canvas.bbox(top)
-                bottom_coords = game_canvas.bbox(bottom)
-                
-                if not top_coords or not bottom_coords:
-                    continue
-                    
-                tx1, ty1, tx2, ty2 = top_coords
-                bx1, by1, bx2, by2 = bottom_coords
-                
-                if (px1 < tx2 and px2 > tx1 and py1 < ty2 and py2 > ty1):
-                    return True
-                if (px1 < bx2 and px2 > bx1 and py1 < by2 and py2 > by1):
-                    return True
-            return False
+                if replay is not None:
+                    replay.record_flap(model.steps)
+                model.flap()
         
-        def move():
-            nonlocal velocity, score, game_running, high_score
-            
+        @callback_tracer.traced('games.frame')
+        def frame():
             if not game_running:
                 return
             
-            velocity += 0.25
-            game_canvas.move(player, 0, velocity)
+            # Run however many fixed steps are due since the last frame
+            dropped = clock.dropped_steps
+            steps = clock.advance(time.perf_counter())
+            metrics.counter('game_frames_total').inc()
+            if clock.dropped_steps > dropped:
+                metrics.counter('game_frames_dropped_total').inc(clock.dropped_steps - dropped)
             
-            for i, pipe in enumerate(pipes[:]):
-                top, bottom, scored = pipe
-                game_canvas.move(top, -3, 0)
-                game_canvas.move(bottom, -3, 0)
-                
-                if not scored and game_canvas.coords(top)[2] < 80:
-                    pipes[pipes.index(pipe)] = (top, bottom, True)
-                    score += 1
+            for _ in range(steps):
+                step(clock.step_seconds)
+                if not game_running:
+                    return
+            renderer.draw()
+            
+            if clock.frames % 30 == 0:
+                game_canvas.itemconfig(fps_text, text=f"{clock.fps():.0f} FPS")
+            game.after(GAME_FRAME_MS, frame)
+        
+        def step(dt):
+            nonlocal pipes_seen
+            for event, pipe in model.step(dt):
+                if event == 'spawn':
+                    pipes_seen += 1
+                    renderer.add_pipe(pipe)
+                elif event == 'score':
                     game_canvas.itemconfig(
                         score_text,
-                        text=f"Score: {score} | High: {high_score}"
+                        text=f"Score: {model.score} | High: {high_score}"
                     )
-                    show_achievement_popup(score)
-                
-                if game_canvas.coords(top)[2] < 0:
-                    game_canvas.delete(top)
-                    game_canvas.delete(bottom)
-                    pipes.remove(pipe)
-            
-            coords = game_canvas.coords(player)
-            if not coords:
-                return
-            
-            y = coords[1]
-            
-            if y < 15 or y > 435 or hit_pipe():
-                end_game()
-                return
-            
-            if random.random() < 0.012:
-                create_pipe()
-            
-            game.after(30, move)
+                    show_achievement_popup(model.score)
+                elif event == 'remove':
+                    renderer.remove_pipe(pipe)
+                elif event == 'crash':
+                    end_game()
         
         def end_game():
             nonlocal game_running, high_score
             game_running = False
+            score = model.score
+            renderer.draw()
+            log_event(logging.INFO, clock.report(), 'games', 'frame_times', score=score)
+            
+            game_sessions.record(score, model.time * 1000, clock.frames, pipes_seen)
+            refresh_leaderboard()
+            
+            if replay is not None:
+                replay.finish(model)
+                try:
+                    save_session_replay(replay)
+                except OSError as e:
+                    log_error(f"Error saving game replay: {str(e)}", 'games', 'replay')
             
             if score > high_score:
                 high_score = score
                 with open(HIGHSCORE_FILE, 'w') as f:
                     f.write(str(high_score))
                 high_score_label.config(text=f"🏆 High Score: {high_score} 🏆")
+                try:
+                    if replay is not None:
+                        replay.save(HIGHSCORE_REPLAY_FILE)
+                        replay_status.config(text="✔ High score recorded in a replay")
+                    elif os.path.exists(HIGHSCORE_REPLAY_FILE):
+                        os.remove(HIGHSCORE_REPLAY_FILE)  # No longer matches the score
+                        replay_status.config(text="")
+                except OSError as e:
+                    log_error(f"Error saving high score replay: {str(e)}", 'games', 'replay')
             
             game_canvas.create_rectangle(50, 180, 350, 320, 
                                         fill="white", outline=COLORS['primary'], width=2)
@@ -1426,10 +4609,18 @@ def create_games_tab(parent, main_window):
             fill=COLORS['text_dark']
         )
         
+        fps_text = game_canvas.create_text(
+            390, 440,
+            text="",
+            anchor="e",
+            font=("Arial", 8),
+            fill=COLORS['text_light']
+        )
+        
         game.bind("<space>", flap)
         game.bind("<Button-1>", flap)
         
-        move()
+        frame()
     
     tk.Button(
         container,
@@ -1442,6 +4633,64 @@ def create_games_tab(parent, main_window):
         command=open_game
     ).pack(pady=20)
     
+    # Replay button
+    def watch_best_game():
+        try:
+            replay = GameReplay.load(HIGHSCORE_REPLAY_FILE)
+        except (OSError, ValueError, struct.error):
+            messagebox.showinfo("No Replay", "Set a new high score to record a replay! 💕")
+            return
+        
+        window = tk.Toplevel()
+        window.title(f"Best Game Replay - Score {replay.score} 💗")
+        window.geometry("400x450")
+        window.resizable(False, False)
+        
+        replay_canvas = tk.Canvas(window, width=400, height=450, bg="#e6f7ff")
+        replay_canvas.pack()
+        
+        player = ReplayPlayer(replay)
+        renderer = FlappyRenderer(replay_canvas, player.model)
+        clock = FixedTimestepClock(1000 / replay.step_hz)
+        replay_score = replay_canvas.create_text(
+            200, 30,
+            text=f"Score: 0 | Replay x{REPLAY_SPEED}",
+            font=("Arial", 12, "bold")
+        )
+        
+        def replay_frame():
+            if not window.winfo_exists():
+                return
+            # Several game steps per frame play it back faster than real time
+            for _ in range(clock.advance(time.perf_counter()) * REPLAY_SPEED):
+                if player.finished:
+                    break
+                for event, pipe in player.step():
+                    if event == 'spawn':
+                        renderer.add_pipe(pipe)
+                    elif event == 'remove':
+                        renderer.remove_pipe(pipe)
+                    elif event == 'score':
+                        replay_canvas.itemconfig(
+                            replay_score,
+                            text=f"Score: {player.model.score} | Replay x{REPLAY_SPEED}"
+                        )
+            renderer.draw()
+            if not player.finished:
+                window.after(GAME_FRAME_MS, replay_frame)
+        
+        replay_frame()
+    
+    tk.Button(
+        container,
+        text="▶ Watch Best Game",
+        font=FONTS['button'],
+        bg=COLORS['secondary'],
+        fg=COLORS['white'],
+        width=20,
+        command=watch_best_game
+    ).pack(pady=5)
+    
     # Achievements button
     def show_achievements():
         ach_window = tk.Toplevel()
@@ -1458,16 +4707,6 @@ def create_games_tab(parent, main_window):
             fg=COLORS['accent']
         ).pack(pady=15)
         
-        # Load unlocked achievements
-        if os.path.exists(ACHIEVEMENTS_FILE):
-            try:
-                with open(ACHIEVEMENTS_FILE, 'r') as f:
-                    unlocked_achievements = json.load(f)
-            except:
-                unlocked_achievements = []
-        else:
-            unlocked_achievements = []
-        
         # Create scrollable frame
         ach_canvas = tk.Canvas(ach_window, bg=COLORS['bg_main'], highlightthickness=0)
         ach_scrollbar = tk.Scrollbar(ach_window, orient="vertical", command=ach_canvas.yview)
@@ -1484,18 +4723,16 @@ def create_games_tab(parent, main_window):
         ach_canvas.pack(side="left", fill="both", expand=True, padx=10)
         ach_scrollbar.pack(side="right", fill="y")
         
-        # Display achievements
-        for score in sorted(achievements.keys()):
+        # Display achievements, one card each
+        ach_frames = {}
+        
+        def draw_card(score):
             ach = achievements[score]
-            is_unlocked = score in unlocked_achievements
-            
-            ach_frame = tk.Frame(
-                scrollable,
-                bg=COLORS['pink_light'] if is_unlocked else "#e0e0e0",
-                relief="raised",
-                borderwidth=2
-            )
-            ach_frame.pack(pady=10, padx=10, fill="x")
+            is_unlocked = achievement_manager.is_unlocked(score)
+            ach_frame = ach_frames[score]
+            for child in ach_frame.winfo_children():
+                child.destroy()
+            ach_frame.configure(bg=COLORS['pink_light'] if is_unlocked else "#e0e0e0")
             
             tk.Label(
                 ach_frame,
@@ -1516,6 +4753,18 @@ def create_games_tab(parent, main_window):
                     justify="center"
                 ).pack(pady=5, padx=10)
         
+        for score in sorted(achievements.keys()):
+            ach_frames[score] = tk.Frame(scrollable, relief="raised", borderwidth=2)
+            ach_frames[score].pack(pady=10, padx=10, fill="x")
+            draw_card(score)
+        
+        # Unlocks made while the window is open update their card in place
+        achievement_manager.add_listener(draw_card)
+        ach_window.bind(
+            "<Destroy>",
+            lambda e: achievement_manager.remove_listener(draw_card) if e.widget is ach_window else None
+        )
+        
         tk.Button(
             ach_window,
             text="Close",
@@ -1643,6 +4892,7 @@ def create_journal_tab(parent, journal_manager, days_together, mood_messages):
     )
     status_label.pack(pady=5)
     
+    @callback_tracer.traced('journal.save_entry')
     def save_entry():
         text = entry_text.get('1.0', 'end-1c').strip()
         if not text:
@@ -1650,12 +4900,13 @@ def create_journal_tab(parent, journal_manager, days_together, mood_messages):
             return
         
         mood = mood_var.get()
-        success, message, email_sent = journal_manager.add_entry(mood, text, days_together)
+        success, message, email_queued = journal_manager.add_entry(mood, text, days_together)
         
         if success:
             status_text = "Entry saved! ✅"
-            if email_sent:
-                status_text += " Email sent! ��"
+            if email_queued:
+                # email_delivered() updates this once the outbox is done
+                status_text += " Sending email... 📧"
             else:
                 status_text += f" ({message})"
             
@@ -1715,6 +4966,7 @@ def create_journal_tab(parent, journal_manager, days_together, mood_messages):
     stats_content = tk.Frame(stats_frame, bg=COLORS['bg_light'])
     stats_content.pack(pady=5, padx=10)
     
+    @callback_tracer.traced('journal.update_statistics')
     def update_statistics():
         stats = journal_manager.get_statistics()
         
@@ -1724,6 +4976,7 @@ def create_journal_tab(parent, journal_manager, days_together, mood_messages):
         stats_text = f"""
         Total Entries: {stats['total_entries']}
         Writing Streak: {stats['writing_streak']} days
+        Longest Streak: {stats['longest_streak']} days
         Most Common Mood: {stats['most_common_mood']}
         First Entry: {stats['first_entry_date']}
         """
@@ -1795,98 +5048,70 @@ def create_journal_tab(parent, journal_manager, days_together, mood_messages):
     )
     search_entry.pack(side='left', padx=5)
     
-    # History list
-    history_canvas = tk.Canvas(history_frame, bg=COLORS['bg_main'], highlightthickness=0, height=200)
-    history_scrollbar = tk.Scrollbar(history_frame, orient="vertical", command=history_canvas.yview)
-    history_list = tk.Frame(history_canvas, bg=COLORS['bg_main'])
+    # Filters of the query whose results are listed
+    shown_query = (None, None)
     
-    history_list.bind(
-        "<Configure>",
-        lambda e: history_canvas.configure(scrollregion=history_canvas.bbox("all"))
-    )
+    def load_more_history(next_cursor):
+        history_search.fetch_more(*shown_query, next_cursor)
     
-    history_canvas.create_window((0, 0), window=history_list, anchor="nw")
-    history_canvas.configure(yscrollcommand=history_scrollbar.set)
+    # History list - only the rows in view are ever built, and entries are
+    # fetched a page at a time as the list is scrolled
+    history_list = VirtualEntryList(history_frame, height=200, on_need_more=load_more_history)
+    history_list.pack()
     
-    history_canvas.pack(side="left", fill="both", expand=True)
-    history_scrollbar.pack(side="right", fill="y")
-    
-    def refresh_history(event=None):
-        # Clear current history
-        for widget in history_list.winfo_children():
-            widget.destroy()
-        
-        # Get filtered entries
-        mood_filter = filter_var.get()
-        search_term = search_var.get()
-        
-        entries = journal_manager.get_entries(
+    def run_history_query(mood_filter, search_term, cursor, cancelled):
+        # Runs on the search worker thread; a newer request cancels it mid-query
+        page = journal_manager.get_entries_page(
+            HISTORY_PAGE_SIZE, cursor,
             mood_filter=mood_filter if mood_filter != "All Moods" else None,
-            search_term=search_term if search_term else None
+            search_term=search_term if search_term else None,
+            cancelled=cancelled
         )
-        
-        if not entries:
-            tk.Label(
-                history_list,
-                text="No entries found. Start writing! 💕",
-                font=FONTS['body'],
-                bg=COLORS['bg_main'],
-                fg=COLORS['text_light']
-            ).pack(pady=20)
+        return None if page is None or cancelled() else (mood_filter, search_term, cursor, page)
+    
+    @callback_tracer.traced('journal.show_history')
+    def show_history(result):
+        nonlocal shown_query
+        mood_filter, search_term, cursor, (entries, next_cursor) = result
+        if cursor is not None:
+            history_list.append_entries(entries, next_cursor)
             return
-        
-        for entry in entries[:10]:  # Show latest 10
-            entry_frame = tk.Frame(
-                history_list,
-                bg=COLORS['white'],
-                relief='raised',
-                borderwidth=1
-            )
-            entry_frame.pack(pady=5, padx=5, fill='x')
-            
-            # Header
-            header_text = f"{entry.get('mood', 'Unknown')} - {entry.get('date', 'Unknown')}"
-            tk.Label(
-                entry_frame,
-                text=header_text,
-                font=FONTS['button'],
-                bg=COLORS['white'],
-                fg=COLORS['accent']
-            ).pack(anchor='w', padx=10, pady=5)
-            
-            # Preview
-            preview = entry.get('entry', '')[:100] + ('...' if len(entry.get('entry', '')) > 100 else '')
-            tk.Label(
-                entry_frame,
-                text=preview,
-                font=FONTS['small'],
-                bg=COLORS['white'],
-                fg=COLORS['text_dark'],
-                wraplength=500,
-                justify='left'
-            ).pack(anchor='w', padx=10, pady=5)
-            
-            # Email status
-            if entry.get('email_sent'):
-                tk.Label(
-                    entry_frame,
-                    text="📧 Email sent",
-                    font=FONTS['small'],
-                    bg=COLORS['white'],
-                    fg=COLORS['success']
-                ).pack(anchor='w', padx=10, pady=2)
-        
+        shown_query = (mood_filter, search_term)
+        history_list.set_entries(entries, next_cursor)
         update_statistics()
     
+    history_search = SearchPipeline(history_frame, run_history_query, show_history)
+    
+    @callback_tracer.traced('journal.refresh_history')
+    def refresh_history(event=None, delay=0):
+        history_search.submit(filter_var.get(), search_var.get(), None, delay=delay)
+    
+    @callback_tracer.traced('journal.email_delivered')
+    def email_delivered(entry_id, email_sent, message):
+        history_list.refresh_entry(entry_id, {'email_sent': email_sent})
+        if email_sent:
+            status_label.config(text="Entry saved! ✅ Email sent! 💌", fg=COLORS['success'])
+        else:
+            status_label.config(text=f"Entry saved! ✅ ({message})", fg=COLORS['success'])
+    
+    ui_queue = UiCallbackQueue(container)
+    journal_manager.add_listener(
+        lambda entry_id, email_sent, message: ui_queue.post(email_delivered, entry_id, email_sent, message)
+    )
+    
+    def on_search_key(event=None):
+        # Debounced so a burst of keystrokes runs a single query
+        refresh_history(delay=SearchPipeline.DEBOUNCE_MS)
+    
     # Bind filter changes
     filter_dropdown.bind('<<ComboboxSelected>>', refresh_history)
-    search_entry.bind('<KeyRelease>', refresh_history)
+    search_entry.bind('<KeyRelease>', on_search_key)
     
     # Initial history load
     refresh_history()
 
 
-def create_settings_tab(parent, settings_manager, email_notifier):
+def create_settings_tab(parent, settings_manager, email_notifier, stall_watchdog=None):
     """Create settings tab"""
     # Create scrollable container
     canvas = tk.Canvas(parent, bg=COLORS['bg_main'], highlightthickness=0)
@@ -2040,6 +5265,78 @@ def create_settings_tab(parent, settings_manager, email_notifier):
         cursor="hand2"
     ).pack(pady=5)
     
+    # ===== PERFORMANCE =====
+    perf_frame = tk.Frame(container, bg=COLORS['white'], relief='raised', borderwidth=2)
+    perf_frame.pack(pady=10, padx=20, fill='x')
+    
+    tk.Label(
+        perf_frame,
+        text="⏱️ Performance",
+        font=FONTS['heading'],
+        bg=COLORS['white'],
+        fg=COLORS['accent']
+    ).pack(pady=10)
+    
+    trace_var = tk.BooleanVar()
+    trace_var.set(callback_tracer.enabled)
+    
+    def toggle_tracing():
+        callback_tracer.enabled = trace_var.get()
+        settings_manager.set('trace_callbacks', callback_tracer.enabled)
+    
+    tk.Checkbutton(
+        perf_frame,
+        text="Measure how long the app takes to respond",
+        variable=trace_var,
+        command=toggle_tracing,
+        font=FONTS['body'],
+        bg=COLORS['white'],
+        fg=COLORS['text_dark'],
+        selectcolor=COLORS['bg_light']
+    ).pack(pady=5)
+    
+    report_text = scrolledtext.ScrolledText(
+        perf_frame,
+        height=8,
+        width=60,
+        font=('Courier', 9),
+        wrap='none'
+    )
+    report_text.pack(pady=5, padx=10)
+    
+    def show_report():
+        report_text.delete('1.0', 'end')
+        report_text.insert('1.0', callback_tracer.report())
+        if stall_watchdog is not None:
+            report_text.insert('end', "\n\n" + stall_watchdog.report())
+    
+    def reset_report():
+        callback_tracer.reset()
+        show_report()
+    
+    report_buttons = tk.Frame(perf_frame, bg=COLORS['white'])
+    report_buttons.pack(pady=10)
+    
+    tk.Button(
+        report_buttons,
+        text="📊 Show Report",
+        font=FONTS['button'],
+        bg=COLORS['primary'],
+        fg=COLORS['white'],
+        command=show_report
+    ).pack(side='left', padx=5)
+    
+    tk.Button(
+        report_buttons,
+        text="Reset",
+        font=FONTS['button'],
+        bg=COLORS['text_light'],
+        fg=COLORS['white'],
+        command=reset_report
+    ).pack(side='left', padx=5)
+    
+    show_report()
+    
     # ===== APP INFO =====
     info_frame = tk.Frame(container, bg=COLORS['bg_light'], relief='raised', borderwidth=2)
     info_frame.pack(pady=20, padx=20, fill='x')
@@ -2081,6 +5378,13 @@ def create_settings_tab(parent, settings_manager, email_notifier):
 
 
 # ================= START APPLICATION =================
-# Start with login window
-login_window.mainloop()
+def main():
+    """Start the GUI with the login window"""
+    load_gui_modules()
+    login_window = create_login_window()
+    login_window.mainloop()
+
+
+if __name__ == "__main__":
+    main()
 
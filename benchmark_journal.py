@@ -0,0 +1,342 @@
+"""
+Benchmarks for the EverydayMood data layer
+
+Generates synthetic journals at several sizes and times the JournalManager
+operations the app relies on: loading, adding entries, queries, pagination
+and statistics. Everything runs in a scratch directory, so your real journal
+is never touched.
+
+Usage:
+    python benchmark_journal.py                          # 1k and 10k entries, log backend
+    python benchmark_journal.py --scales 1000,100000,1000000 --backends log,sqlite
+    python benchmark_journal.py --output after.json --baseline before.json
+    python benchmark_journal.py --compare before.json after.json
+    python benchmark_journal.py --email                  # also time email delivery
+
+Results are written as JSON. With --baseline or --compare, any operation whose
+median got slower than the threshold (default 20%, and by more than
+NOISE_FLOOR_MS) is reported as a regression and the exit code is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import EverydayMood as app
+from smtp_standin import LocalSMTPServer
+
+DEFAULT_SCALES = [1000, 10000]
+DEFAULT_BACKENDS = ['log']
+DEFAULT_THRESHOLD = 0.2
+# Slowdowns smaller than this are timer noise, whatever the percentage
+NOISE_FLOOR_MS = 0.05
+
+# Mood mix for generated entries, keyed by the mood name without its emoji
+MOOD_WEIGHTS = {
+    'Happy': 30,
+    'Excited': 15,
+    'Miss You': 15,
+    'Tired': 12,
+    'Stressed': 10,
+    'Sad': 8,
+    'Anxious': 6,
+    'Lonely': 4,
+}
+
+
+# ================= SYNTHETIC DATA =================
+def build_vocabulary():
+    """Words taken from the app's own messages, so searches hit real text"""
+    words = set()
+    texts = app.daily_messages + app.morning_messages + app.night_messages
+    for messages in app.mood_messages.values():
+        texts += messages
+    for text in texts:
+        words.update(app.tokenize_text(text))
+    return sorted(words)
+
+
+def generate_entries(count, seed=23):
+    """
+    Create count journal entries, oldest first.
+    Entries are spread over the days since START_DATE, with a few busy
+    days, and lengths follow a long-tailed distribution like real writing.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary()
+    moods = list(app.mood_messages)
+    weights = [MOOD_WEIGHTS.get(mood.rsplit(" ", 1)[0], 2) for mood in moods]
+    
+    start = datetime.combine(app.START_DATE, datetime.min.time())
+    span = max(1, (datetime.now() - start).days) * 86400
+    offsets = sorted(rng.randrange(span) for _ in range(count))
+    
+    entries = []
+    for entry_id, offset in enumerate(offsets, 1):
+        written = start + timedelta(seconds=offset)
+        length = min(400, int(rng.lognormvariate(3.3, 0.8)) + 1)
+        entries.append({
+            "id": entry_id,
+            "timestamp": written.strftime('%Y-%m-%d %H:%M:%S'),
+            "date": written.strftime('%Y-%m-%d'),
+            "mood": rng.choices(moods, weights)[0],
+            "entry": " ".join(rng.choice(vocabulary) for _ in range(length)),
+            "email_sent": rng.random() < 0.9,
+            "days_together": (written.date() - app.START_DATE).days
+        })
+    return entries, vocabulary
+
+
+def write_journal(entries):
+    """Write entries as the JSON snapshot the app loads on startup"""
+    with open(app.JOURNAL_FILE, 'w') as f:
+        json.dump(entries, f)
+
+
+# ================= TIMING =================
+def summarize(samples):
+    """Timing samples (seconds) -> summary in milliseconds"""
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 4),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 4),
+        'p95_ms': round(p95 * 1000, 4),
+        'min_ms': round(samples[0] * 1000, 4)
+    }
+
+
+def time_calls(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_scale(backend, count, repeat):
+    """Time every operation against a fresh journal of count entries"""
+    results = {}
+    entries, vocabulary = generate_entries(count)
+    rng = random.Random(count)
+    
+    write_journal(entries)
+    if backend == 'sqlite':
+        started = time.perf_counter()
+        app.migrate_json_to_sqlite()
+        results['migrate_json_to_sqlite'] = summarize([time.perf_counter() - started])
+    
+    managers = []
+    
+    def load():
+        managers.append(app.JournalManager(backend))
+    
+    # Loading is slow at large sizes, so it gets fewer runs
+    results['load_entries'] = summarize(time_calls(load, max(1, repeat // 5)))
+    manager = managers[-1]
+    
+    moods = list(app.mood_messages)
+    results['add_entry'] = summarize(time_calls(
+        lambda: manager.add_entry(rng.choice(moods), " ".join(rng.sample(vocabulary, 20)), 0),
+        repeat * 5
+    ))
+    
+    started = time.perf_counter()
+    app.write_coalescer.flush()
+    results['flush'] = summarize([time.perf_counter() - started])
+    
+    results['get_entries'] = summarize(time_calls(manager.get_entries, repeat))
+    results['get_entries_mood'] = summarize(time_calls(
+        lambda: manager.get_entries(mood_filter=rng.choice(moods)), repeat
+    ))
+    results['get_entries_search'] = summarize(time_calls(
+        lambda: manager.get_entries(search_term=rng.choice(vocabulary)), repeat
+    ))
+    results['get_entries_prefix'] = summarize(time_calls(
+        lambda: manager.get_entries(search_term=rng.choice(vocabulary)[:2]), repeat
+    ))
+    
+    last_day = entries[-1]['date'] if entries else None
+    first_day = entries[len(entries) // 2]['date'] if entries else None
+    results['get_entries_between'] = summarize(time_calls(
+        lambda: manager.get_entries_between(first_day, last_day), repeat
+    ))
+    
+    def walk_pages(pages=10):
+        cursor = None
+        for _ in range(pages):
+            page, cursor = manager.get_entries_page(20, cursor)
+            if cursor is None:
+                break
+    results['get_entries_page_x10'] = summarize(time_calls(walk_pages, repeat))
+    results['get_statistics'] = summarize(time_calls(manager.get_statistics, repeat * 5))
+    
+    for manager in managers:
+        manager.store.close()
+    return results
+
+
+def bench_email(messages):
+    """Time queued email delivery against the in-process SMTP stand-in"""
+    server = LocalSMTPServer()
+    server.start()
+    try:
+        manager = app.JournalManager()
+        manager.email_notifier.config.update(server.email_config())
+        
+        started = time.perf_counter()
+        for _ in range(messages):
+            manager.add_entry(list(app.mood_messages)[0], "benchmark entry", 0)
+        while len(server.messages) < messages:
+            if time.perf_counter() - started > 60:
+                break
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - started
+        return {
+            'messages': len(server.messages),
+            'connections': server.connections,
+            'total_ms': round(elapsed * 1000, 4),
+            'per_message_ms': round(elapsed * 1000 / max(1, len(server.messages)), 4)
+        }
+    finally:
+        server.stop()
+
+
+def run_benchmarks(scales, backends, repeat, email=False):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="everydaymood-bench-")
+    previous_dir = os.getcwd()
+    try:
+        for backend in backends:
+            for count in scales:
+                # Each scale starts from an empty directory
+                rundir = os.path.join(workdir, f"{backend}-{count}")
+                os.makedirs(rundir)
+                os.chdir(rundir)
+                print(f"{backend:>6} {count:>9,} entries ...", end=" ", flush=True)
+                started = time.perf_counter()
+                for operation, summary in bench_scale(backend, count, repeat).items():
+                    results[f"{backend}/{count}/{operation}"] = summary
+                print(f"{time.perf_counter() - started:.1f}s")
+        
+        if email:
+            rundir = os.path.join(workdir, "email")
+            os.makedirs(rundir)
+            os.chdir(rundir)
+            results['email/outbox'] = bench_email(200)
+    finally:
+        app.write_coalescer.flush()
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'meta': {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scales': scales,
+            'backends': backends,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+# ================= COMPARISON =================
+def compare_results(baseline, current):
+    """
+    Compare median timings of two runs
+    Returns: list of (name, old_ms, new_ms, change) for every shared operation
+    """
+    rows = []
+    for name, summary in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old or 'median_ms' not in summary or 'median_ms' not in old:
+            continue
+        old_ms, new_ms = old['median_ms'], summary['median_ms']
+        change = (new_ms - old_ms) / old_ms if old_ms else 0.0
+        rows.append((name, old_ms, new_ms, change))
+    return rows
+
+
+def print_comparison(rows, threshold=DEFAULT_THRESHOLD):
+    """Print a comparison table; returns the number of regressions"""
+    regressions = 0
+    print(f"{'operation':<42} {'before ms':>11} {'after ms':>11} {'change':>8}")
+    for name, old_ms, new_ms, change in rows:
+        flag = ""
+        if change > threshold and new_ms - old_ms > NOISE_FLOOR_MS:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold and old_ms - new_ms > NOISE_FLOOR_MS:
+            flag = "  faster"
+        print(f"{name:<42} {old_ms:>11.3f} {new_ms:>11.3f} {change:>+8.0%}{flag}")
+    print(f"\n{regressions} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def print_results(report):
+    print(f"\n{'operation':<42} {'median ms':>11} {'p95 ms':>11} {'runs':>6}")
+    for name, summary in report['results'].items():
+        if 'median_ms' in summary:
+            print(f"{name:<42} {summary['median_ms']:>11.3f} {summary['p95_ms']:>11.3f} {summary['runs']:>6}")
+        else:
+            print(f"{name:<42} " + " ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+def load_report(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EverydayMood journal data layer")
+    parser.add_argument('--scales', default=",".join(map(str, DEFAULT_SCALES)),
+                        help="comma-separated journal sizes (default: %(default)s)")
+    parser.add_argument('--backends', default=",".join(DEFAULT_BACKENDS),
+                        help="comma-separated storage backends: log, sqlite (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="timed runs per query (default: %(default)s)")
+    parser.add_argument('--email', action='store_true',
+                        help="also time email delivery through a local SMTP stand-in")
+    parser.add_argument('--output', default="benchmark_results.json",
+                        help="where to write results (default: %(default)s)")
+    parser.add_argument('--baseline', help="earlier results to compare this run against")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help="compare two result files without running anything")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown that counts as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+    
+    if args.compare:
+        rows = compare_results(load_report(args.compare[0]), load_report(args.compare[1]))
+        return 1 if print_comparison(rows, args.threshold) else 0
+    
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    backends = [backend for backend in args.backends.split(",") if backend]
+    report = run_benchmarks(scales, backends, max(1, args.repeat), args.email)
+    print_results(report)
+    
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nResults written to {args.output}")
+    
+    if args.baseline:
+        print()
+        rows = compare_results(load_report(args.baseline), report)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+In-process SMTP stand-in for benchmarks and tests
+
+LocalSMTPServer speaks just enough SMTP for smtplib, so email delivery can
+be exercised without a real mail server or network access. It is used by
+benchmark_journal.py --email and by the email outbox tests.
+
+Usage:
+    server = LocalSMTPServer().start()
+    notifier.config.update(server.email_config())
+    ...
+    server.stop()
+"""
+
+import socketserver
+import threading
+
+
+class LocalSMTPServer:
+    """
+    Minimal in-process SMTP server for trying out email delivery offline.
+    It accepts any login, keeps received messages in memory and can be told
+    to refuse the next few messages to exercise the retry path, or to
+    reject every login.
+    
+    Point the app at it with the settings from email_config().
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0):
+        self.messages = []
+        self.connections = 0
+        self.failures_left = 0
+        self.reject_logins = False
+        self.lock = threading.Lock()
+        
+        standin = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                standin.handle_session(self.rfile, self.wfile)
+        
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address
+        self.thread = None
+    
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="smtp-standin", daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def fail_next(self, count):
+        """Reject the next count messages with a temporary (4xx) error"""
+        with self.lock:
+            self.failures_left = count
+    
+    def email_config(self):
+        """email_config.json settings that send to this server"""
+        return {
+            "smtp_server": self.host,
+            "smtp_port": self.port,
+            "use_tls": False,
+            "sender_email": "journal@localhost",
+            "sender_password": "standin",
+            "recipient_email": "inbox@localhost",
+            "notifications_enabled": True
+        }
+    
+    def handle_session(self, rfile, wfile):
+        """Speak just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA"""
+        def reply(line):
+            wfile.write(line.encode('ascii') + b"\r\n")
+            wfile.flush()
+        
+        with self.lock:
+            self.connections += 1
+        reply("220 localhost EverydayMood SMTP stand-in")
+        mail_from, recipients = None, []
+        
+        for raw in rfile:
+            command = raw.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            
+            if verb == 'EHLO':
+                wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                wfile.flush()
+            elif verb == 'HELO':
+                reply("250 localhost")
+            elif verb == 'AUTH':
+                if command.upper().startswith('AUTH LOGIN') and len(command.split()) < 3:
+                    reply("334 VXNlcm5hbWU6")
+                    rfile.readline()
+                    reply("334 UGFzc3dvcmQ6")
+                    rfile.readline()
+                if self.reject_logins:
+                    reply("535 5.7.8 Authentication credentials invalid")
+                else:
+                    reply("235 2.7.0 Authentication successful")
+            elif verb == 'MAIL':
+                with self.lock:
+                    refuse = self.failures_left > 0
+                    if refuse:
+                        self.failures_left -= 1
+                if refuse:
+                    reply("451 4.3.0 Temporary failure, try again later")
+                else:
+                    mail_from, recipients = command[10:].strip(), []
+                    reply("250 OK")
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip())
+                reply("250 OK")
+            elif verb == 'DATA':
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data_line in rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                with self.lock:
+                    self.messages.append((mail_from, recipients, b"".join(lines)))
+                reply("250 OK: queued")
+            elif verb in ('NOOP', 'RSET'):
+                reply("250 OK")
+            elif verb == 'QUIT':
+                reply("221 Bye")
+                return
+            else:
+                reply("502 Command not implemented")
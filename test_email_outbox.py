@@ -0,0 +1,158 @@
+"""
+Tests for the email outbox: retries, persistence and giving up
+
+Delivery goes to the in-process SMTP stand-in from smtp_standin.py, and
+every test runs in its own scratch directory.
+
+Usage:
+    python -m pytest test_email_outbox.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import EverydayMood as app
+from smtp_standin import LocalSMTPServer
+
+log_dir = None
+
+
+def setUpModule():
+    global log_dir
+    log_dir = tempfile.mkdtemp(prefix="everydaymood-log-")
+    app.setup_logging(os.path.join(log_dir, app.ERROR_LOG_FILE))
+
+
+def tearDownModule():
+    app.stop_logging()
+    shutil.rmtree(log_dir, ignore_errors=True)
+
+
+def wait_for(condition, timeout=10):
+    """Poll until condition() is true; returns its last value"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class EmailOutboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_dir = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix="everydaymood-test-")
+        os.chdir(self.workdir)
+        self.outbox_file = os.path.join(self.workdir, app.EMAIL_OUTBOX_FILE)
+        
+        self.server = LocalSMTPServer().start()
+        self.notifier = app.EmailNotifier()
+        self.notifier.config.update(self.server.email_config())
+        self.done = []
+    
+    def tearDown(self):
+        app.write_coalescer.flush()
+        self.notifier.session.close()
+        self.server.stop()
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+    
+    def make_outbox(self, retry_base=0.01, max_attempts=app.EmailOutbox.MAX_ATTEMPTS):
+        outbox = app.EmailOutbox(self.notifier, self.outbox_file,
+                                 on_done=lambda *result: self.done.append(result))
+        outbox.RETRY_BASE = retry_base
+        outbox.MAX_ATTEMPTS = max_attempts
+        return outbox
+    
+    def saved_items(self):
+        app.write_coalescer.flush()
+        with open(self.outbox_file, 'r') as f:
+            return json.load(f)
+    
+    def entry(self, entry_id=1):
+        return {"id": entry_id, "date": "2024-02-14", "mood": "Happy 😊", "entry": "test entry"}
+    
+    def test_transient_failure_is_retried_then_delivered(self):
+        self.server.fail_next(2)
+        outbox = self.make_outbox()
+        outbox.enqueue(self.entry())
+        
+        self.assertTrue(wait_for(lambda: any(success for _, success, _ in self.done)))
+        self.assertEqual([success for _, success, _ in self.done], [False, False, True])
+        self.assertTrue(self.done[0][2].endswith("will retry"))
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(outbox.pending_count(), 0)
+        self.assertEqual(self.saved_items(), [])
+    
+    def test_pending_email_is_saved(self):
+        self.server.fail_next(1)
+        outbox = self.make_outbox(retry_base=60)
+        outbox.enqueue(self.entry(7))
+        
+        self.assertTrue(wait_for(lambda: self.done))
+        items = self.saved_items()
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]['entry']['id'], 7)
+        self.assertEqual(items[0]['attempts'], 1)
+        self.assertIn("451", items[0]['last_error'])
+        self.assertGreater(items[0]['next_attempt'], time.time())
+    
+    def test_pending_emails_are_sent_after_restart(self):
+        pending = [
+            {'entry': self.entry(entry_id), 'attempts': 1, 'next_attempt': 0, 'last_error': "timed out"}
+            for entry_id in (3, 4)
+        ]
+        with open(self.outbox_file, 'w') as f:
+            json.dump(pending, f)
+        
+        outbox = self.make_outbox()
+        self.assertEqual(outbox.pending_count(), 2)
+        outbox.start()
+        
+        self.assertTrue(wait_for(lambda: len(self.done) == 2))
+        self.assertEqual(sorted(entry_id for entry_id, _, _ in self.done), [3, 4])
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.saved_items(), [])
+    
+    def test_gives_up_after_max_attempts(self):
+        self.server.fail_next(10)
+        outbox = self.make_outbox(max_attempts=3)
+        outbox.enqueue(self.entry())
+        
+        self.assertTrue(wait_for(lambda: len(self.done) == 3))
+        time.sleep(0.1)
+        self.assertEqual(len(self.done), 3)
+        self.assertFalse(any(success for _, success, _ in self.done))
+        self.assertFalse(self.done[-1][2].endswith("will retry"))
+        self.assertEqual(self.server.failures_left, 7)
+        self.assertEqual(outbox.pending_count(), 0)
+        self.assertEqual(self.saved_items(), [])
+    
+    def test_rejected_login_is_not_retried(self):
+        self.server.reject_logins = True
+        outbox = self.make_outbox()
+        outbox.enqueue(self.entry())
+        
+        self.assertTrue(wait_for(lambda: self.done))
+        time.sleep(0.1)
+        self.assertEqual(len(self.done), 1)
+        self.assertIn("Authentication failed", self.done[0][2])
+        self.assertEqual(outbox.pending_count(), 0)
+    
+    def test_disabled_notifications_are_not_retried(self):
+        self.notifier.config['notifications_enabled'] = False
+        outbox = self.make_outbox()
+        outbox.enqueue(self.entry())
+        
+        self.assertTrue(wait_for(lambda: self.done))
+        time.sleep(0.1)
+        self.assertEqual(self.done, [(1, False, "Notifications disabled")])
+        self.assertEqual(self.server.connections, 0)
+        self.assertEqual(outbox.pending_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
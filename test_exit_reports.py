@@ -0,0 +1,91 @@
+"""
+Tests for the performance reports written to the log at exit
+
+Logging runs with the default settings (LOG_LEVEL), so these show the
+reports reach error_log.txt without "log_level" being changed.
+
+Usage:
+    python -m pytest test_exit_reports.py
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import EverydayMood as app
+
+
+class ExitReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="everydaymood-test-")
+        self.log_file = os.path.join(self.workdir, app.ERROR_LOG_FILE)
+        app.stop_logging()
+        app.setup_logging(self.log_file)
+    
+    def tearDown(self):
+        app.stop_logging()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+    
+    def logged(self):
+        app.stop_logging()
+        if not os.path.exists(self.log_file):
+            return ""
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def test_default_level_is_warning(self):
+        self.assertEqual(app.app_logger.level, app.LOG_LEVEL)
+        self.assertEqual(app.LOG_LEVEL, app.logging.WARNING)
+    
+    def test_trace_report_is_logged_when_tracing(self):
+        tracer = app.CallbackTracer()
+        tracer.enabled = True
+        
+        @tracer.traced('journal.save_entry')
+        def save_entry():
+            return True
+        
+        save_entry()
+        save_entry()
+        tracer.log_report()
+        
+        log = self.logged()
+        self.assertIn("UI callback latency", log)
+        self.assertIn("journal.save_entry", log)
+    
+    def test_no_trace_report_without_tracing(self):
+        tracer = app.CallbackTracer()
+        
+        @tracer.traced('journal.save_entry')
+        def save_entry():
+            return True
+        
+        save_entry()
+        tracer.log_report()
+        
+        self.assertNotIn("UI callback latency", self.logged())
+    
+    def test_stall_report_is_logged(self):
+        watchdog = app.StallWatchdog(None, threshold_ms=200)
+        now = time.monotonic()
+        watchdog.last_beat = now - 1.0
+        watchdog.check(now)
+        watchdog.last_beat = now + 0.1  # The loop came back
+        watchdog.check(now + 0.2)
+        watchdog.log_report()
+        
+        log = self.logged()
+        self.assertIn("Main loop stalls over 200 ms: 1", log)
+    
+    def test_no_stall_report_without_stalls(self):
+        watchdog = app.StallWatchdog(None, threshold_ms=200)
+        watchdog.log_report()
+        
+        self.assertNotIn("Main loop stalls", self.logged())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for journal queries on both storage backends: paging through
+filtered entries and cancelling a query part way through
+
+Usage:
+    python -m pytest test_journal_queries.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import EverydayMood as app
+
+MOODS = ["Happy 😊", "Sad 😔", "Loving 💕"]
+
+
+class JournalQueryTest:
+    """Shared tests; subclasses pick the backend"""
+    
+    backend = None
+    
+    def setUp(self):
+        self.previous_dir = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix="everydaymood-test-")
+        os.chdir(self.workdir)
+        self.manager = app.JournalManager(backend=self.backend)
+        for i in range(1, 3001):
+            self.manager.store.add({
+                "id": i,
+                "timestamp": f"2024-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}",
+                "date": "2024-01-01",
+                "mood": MOODS[i % len(MOODS)],
+                "entry": f"walk number {i} in the park" + (" rain" if i % 7 == 0 else ""),
+                "email_sent": False,
+                "days_together": i,
+            })
+    
+    def tearDown(self):
+        self.manager.store.close()
+        app.write_coalescer.flush()
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+    
+    def all_pages(self, limit, **filters):
+        entries = []
+        cursor = None
+        while True:
+            page, cursor = self.manager.get_entries_page(limit, cursor, **filters)
+            entries.extend(page)
+            if cursor is None:
+                return entries
+    
+    def assert_pages_match_query(self, **filters):
+        expected = [e['id'] for e in self.manager.get_entries(**filters)]
+        self.assertTrue(expected)
+        for limit in (7, 500):
+            self.assertEqual([e['id'] for e in self.all_pages(limit, **filters)], expected)
+    
+    def test_pages_without_filters(self):
+        self.assert_pages_match_query()
+    
+    def test_pages_with_mood_filter(self):
+        self.assert_pages_match_query(mood_filter=MOODS[1])
+    
+    def test_pages_with_search(self):
+        # Common word, rare word, a partly typed number and two words
+        for search_term in ("park", "rain", "25", "number 1"):
+            self.assert_pages_match_query(search_term=search_term)
+            self.assert_pages_match_query(mood_filter=MOODS[2], search_term=search_term)
+    
+    def test_cancelled_page_returns_none(self):
+        self.assertIsNone(self.manager.get_entries_page(10, search_term="park", cancelled=lambda: True))
+    
+    def test_query_without_cancel(self):
+        entries = self.manager.get_entries(search_term="park", cancelled=lambda: False)
+        self.assertEqual(len(entries), 3000)
+        self.assertEqual(entries[0]['id'], 3000)
+    
+    def test_cancelled_query_returns_none(self):
+        self.assertIsNone(self.manager.get_entries(search_term="park", cancelled=lambda: True))
+        self.assertIsNone(self.manager.get_entries(search_term="!!", cancelled=lambda: True))
+    
+    def test_query_stops_soon_after_cancel(self):
+        checks = []
+        
+        def cancelled():
+            checks.append(1)
+            return len(checks) > 2
+        
+        self.assertIsNone(self.manager.get_entries(search_term="walk park", cancelled=cancelled))
+        # Far fewer checks than entries: it gave up rather than finishing
+        self.assertLess(len(checks), 10)
+    
+    def test_cancelled_query_releases_lock(self):
+        self.manager.get_entries(search_term="park", cancelled=lambda: True)
+        self.assertTrue(self.manager.lock.acquire(blocking=False))
+        self.manager.lock.release()
+
+
+class LogJournalQueryTest(JournalQueryTest, unittest.TestCase):
+    backend = 'log'
+    
+    def tearDown(self):
+        # Adding the entries can start a compaction in the working directory
+        compaction = self.manager.store.journal_log.compaction_thread
+        if compaction is not None:
+            compaction.join()
+        super().tearDown()
+
+
+class SqliteJournalQueryTest(JournalQueryTest, unittest.TestCase):
+    backend = 'sqlite'
+
+
+if __name__ == "__main__":
+    unittest.main()